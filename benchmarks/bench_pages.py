@@ -0,0 +1,387 @@
+"""Per-rerun latency benchmark for the dashboard pages
+
+Drives every page headlessly with Streamlit's AppTest, replays a scripted
+sequence of widget interactions and records, per page:
+
+- wall time of every rerun (p50 / p95 / max)
+- peak Python heap allocated during a rerun (tracemalloc, separate pass)
+- build time of every figure the builders actually constructed
+- bytes and serialization time of every chart sent (separate pass)
+- a fresh process's startup: its first run and the import time of the
+  heaviest top-level modules (`python -X importtime`), as a cold worker
+  pays them
+
+Results go to a JSON file so runs from different commits can be compared:
+
+    python benchmarks/bench_pages.py --output before.json
+    python benchmarks/bench_pages.py --output after.json --compare before.json
+
+Run it from the repository root; the pages open their data with paths
+relative to it.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import figure_cache  # noqa: E402
+import figure_emit  # noqa: E402
+
+
+# Each step is (label, action). An action takes the AppTest, sets a widget
+# value and returns the widget, whose run() then triggers the rerun.
+def _slider(key=None, index=0):
+    def pick(at):
+        return at.slider(key=key) if key else at.slider[index]
+    return pick
+
+
+def _multiselect(key=None, index=0):
+    def pick(at):
+        return at.multiselect(key=key) if key else at.multiselect[index]
+    return pick
+
+
+def _tab(key, label):
+    """Switch the lazy st.tabs with `key` to the tab `label`"""
+    def pick(at):
+        at.session_state[key] = label
+        return at
+    return pick
+
+
+def _drag(pick, values):
+    """One step per slider tick, as a user dragging the handle would send"""
+    return [
+        (f"drag {value}", lambda at, value=value: pick(at).set_value(value))
+        for value in values
+    ]
+
+
+SCENARIOS = {
+    "nutrients": {
+        "script": "src/nutrients.py",
+        "steps": [
+            *_drag(_slider(), [(1985, y) for y in range(2023, 2013, -2)]),
+            ("select areas", lambda at: _multiselect()(at).set_value(["Austria", "France", "Japan"])),
+            ("add area", lambda at: _multiselect()(at).set_value(["Austria", "France", "Japan", "Korea"])),
+            ("n_meas", lambda at: at.radio(key="n_meas").set_value("Output")),
+            ("n_type", lambda at: at.radio(key="n_type").set_value("Phosphorus")),
+            ("cat_type", lambda at: at.radio(key="cat_type").set_value("Phosphorus")),
+            ("live_type", lambda at: at.radio(key="live_type").set_value("Phosphorus")),
+            ("all areas", lambda at: _multiselect()(at).set_value(["All areas"])),
+        ],
+    },
+    "land_charts": {
+        "script": "src/pages/land_charts.py",
+        "steps": [
+            *_drag(_slider(), [(y, 2023) for y in range(1985, 2005, 4)]),
+            ("select countries", lambda at: _multiselect(index=0)(at).set_value(["Canada", "France", "Japan"])),
+            ("land types", lambda at: _multiselect(index=1)(at).set_value(["Arable land", "Permanent crops"])),
+            ("composition tab", _tab("land_tab", "🥧 Composition Breakdown")),
+        ],
+    },
+    "erosion_charts": {
+        "script": "src/pages/erosion_charts.py",
+        "steps": [
+            *_drag(_slider(), [(y, 2022) for y in range(1990, 2010, 4)]),
+            ("select countries", lambda at: _multiselect(index=0)(at).set_value(["Australia", "Canada"])),
+            ("severity", lambda at: _multiselect(index=2)(at).set_value(["_T", "LW"])),
+        ],
+    },
+    "greenhouse-gas": {
+        "script": "src/pages/greenhouse-gas.py",
+        "steps": [
+            *_drag(_slider(key="combo_time"), [(1985, y) for y in range(2021, 2005, -4)]),
+            ("combo region", lambda at: at.selectbox(key="combo_region").set_value("France")),
+            ("combo measures", lambda at: at.multiselect(key="combo_measures").set_value(["CH4", "CO2"])),
+            ("pie tab", _tab("ghg_tab", "📊 Pie Chart")),
+            ("pie category", lambda at: at.selectbox(key="pie_category").set_value("AGR")),
+            ("pie region", lambda at: at.selectbox(key="pie_region").set_value("Japan")),
+            ("map tab", _tab("ghg_tab", "🌀 Heatmap")),
+            ("map year", lambda at: at.selectbox(key="map_year").set_value(2000)),
+            ("map measure", lambda at: at.selectbox(key="map_measure").set_value("CH4")),
+            ("back to kpi tab", _tab("ghg_tab", "📈 KPI")),
+        ],
+    },
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * q / 100
+    low, high = int(rank), min(int(rank) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values):
+    return {
+        "n": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else None,
+    }
+
+
+def replay(scenario, timeout, on_step):
+    """Run the page, then every step. on_step(label) returns the context
+    manager wrapped around each rerun."""
+    at = AppTest.from_file(os.path.join(ROOT, scenario["script"]), default_timeout=timeout)
+
+    with on_step("initial"):
+        at.run()
+    _check(at, "initial")
+
+    for label, action in scenario["steps"]:
+        widget = action(at)
+        with on_step(label):
+            widget.run()
+        _check(at, label)
+
+
+def _check(at, label):
+    if at.exception:
+        messages = "; ".join(e.message for e in at.exception)
+        raise RuntimeError(f"page raised during '{label}': {messages}")
+
+
+class _Timer:
+    def __init__(self, samples, label):
+        self.samples, self.label = samples, label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.samples.append((self.label, time.perf_counter() - self.start))
+
+
+class _HeapPeak:
+    def __init__(self, samples, label):
+        self.samples, self.label = samples, label
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+
+    def __exit__(self, *exc):
+        self.samples.append((self.label, tracemalloc.get_traced_memory()[1] - self.base))
+
+
+class _Payloads:
+    """Total bytes of the charts sent during a rerun"""
+    def __init__(self, log, samples, label):
+        self.log, self.samples, self.label = log, samples, label
+
+    def __enter__(self):
+        self.start = len(self.log)
+
+    def __exit__(self, *exc):
+        self.samples.append((self.label, sum(size for _, size, _ in self.log[self.start:])))
+
+
+def bench_page(name, scenario, repeat, timeout):
+    timings, builds, peaks, rerun_bytes = [], [], [], []
+
+    figure_cache.build_log = builds
+    try:
+        for _ in range(repeat):
+            replay(scenario, timeout, lambda label: _Timer(timings, label))
+    finally:
+        figure_cache.build_log = None
+
+    tracemalloc.start()
+    try:
+        replay(scenario, timeout, lambda label: _HeapPeak(peaks, label))
+    finally:
+        tracemalloc.stop()
+
+    # Serializing every chart again would skew the timings above
+    figure_emit.emit_log = payloads = []
+    try:
+        replay(scenario, timeout, lambda label: _Payloads(payloads, rerun_bytes, label))
+    finally:
+        figure_emit.emit_log = None
+
+    # The first run of the first repeat pays for loading the data
+    cold = timings[0][1]
+    warm = [seconds for label, seconds in timings[1:] if label != "initial"]
+
+    charts = {}
+    for chart, seconds in builds:
+        charts.setdefault(chart, []).append(seconds)
+
+    sent = {}
+    for chart, size, seconds in payloads:
+        sent.setdefault(chart, []).append((size, seconds))
+
+    return {
+        "cold_start_s": cold,
+        "rerun_s": summarize(warm),
+        "steps_s": {
+            label: summarize([s for step, s in timings if step == label])
+            for label in dict.fromkeys(label for label, _ in timings)
+        },
+        "peak_heap_bytes": {
+            "max": max(peak for _, peak in peaks),
+            "steps": dict(peaks),
+        },
+        "chart_build_s": {chart: summarize(values) for chart, values in sorted(charts.items())},
+        "payload_bytes": {
+            "rerun": summarize([size for _, size in rerun_bytes]),
+            "steps": dict(rerun_bytes),
+            "charts": {
+                chart: {
+                    "bytes": summarize([size for size, _ in values]),
+                    "serialize_s": summarize([seconds for _, seconds in values]),
+                }
+                for chart, values in sorted(sent.items())
+            },
+        },
+    }
+
+
+# Top-level modules reported from a cold process's import times
+TOP_IMPORTS = 10
+
+
+# Runs in a fresh `python -X importtime` process: one run of a page, then
+# its first run time and deferred imports as JSON on stdout
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout={timeout!r})
+at.run()
+if at.exception:
+    sys.exit("; ".join(e.message for e in at.exception))
+import lazy_import
+print(json.dumps({{
+    "first_run_s": time.perf_counter() - start,
+    "deferred_imports_s": lazy_import.import_times,
+}}))
+"""
+
+
+def _import_times(stderr):
+    """Cumulative seconds per top-level module from -X importtime output"""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return dict(sorted(times.items(), key=lambda item: -item[1])[:TOP_IMPORTS])
+
+
+def cold_start(page, timeout):
+    """Startup of a fresh process serving `page`; the import times include
+    Streamlit's own, as a worker pays them too"""
+    start = time.perf_counter()
+    script = os.path.join(ROOT, SCENARIOS[page]["script"])
+    code = PROBE.format(src=SRC, script=script, timeout=timeout)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, timeout=timeout, check=True
+    )
+    process = time.perf_counter() - start
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    return {
+        "process_s": process,
+        "first_run_s": report["first_run_s"],
+        "deferred_imports_s": report["deferred_imports_s"],
+        "imports_s": _import_times(result.stderr),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    """Print p50/p95 rerun deltas against an earlier result file"""
+    for page, result in current["pages"].items():
+        before = previous.get("pages", {}).get(page)
+        if not before:
+            continue
+        for stat in ("p50", "p95"):
+            new, old = result["rerun_s"][stat], before["rerun_s"][stat]
+            if new is None or not old:
+                continue
+            print(f"{page:16} {stat}: {old * 1000:8.1f} ms -> {new * 1000:8.1f} ms ({(new - old) / old:+.0%})")
+
+        new, old = result["payload_bytes"]["rerun"]["p50"], before.get("payload_bytes", {}).get("rerun", {}).get("p50")
+        if new is not None and old:
+            print(f"{page:16} payload p50: {old:8.0f} B -> {new:8.0f} B ({(new - old) / old:+.0%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", help=f"pages to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="scenario replays per page for timings")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--output", default="bench_output.json", help="result file to write")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.pages) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(sorted(unknown))}")
+
+    os.chdir(ROOT)
+    pages = args.pages or list(SCENARIOS)
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "pages": {},
+    }
+    for page in pages:
+        print(f"benchmarking {page} ...", file=sys.stderr)
+        results["pages"][page] = bench_page(page, SCENARIOS[page], args.repeat, args.timeout)
+        results["pages"][page]["cold_process"] = cold_start(page, args.timeout)
+        rerun = results["pages"][page]["rerun_s"]
+        print(
+            f"{page:16} cold {results['pages'][page]['cold_start_s'] * 1000:8.1f} ms"
+            f"  p50 {rerun['p50'] * 1000:8.1f} ms  p95 {rerun['p95'] * 1000:8.1f} ms"
+        )
+
+    # ru_maxrss is KiB on Linux
+    results["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
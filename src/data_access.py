@@ -0,0 +1,400 @@
+"""Shared access to the datasets under ./src/dataset
+
+The first load of a dataset converts its CSV into a column store in
+./src/dataset/.cache: one binary .npy array per column, numbers as they
+are and text as integer codes into a table of labels. Later loads map only
+the requested arrays read-only into memory, so every worker process on a
+host shares one page cache copy of the data instead of holding its own.
+A store older than its CSV is rebuilt on the next load. Loaded frames are
+cached per process and shared between sessions, so callers must treat them
+as read-only.
+"""
+import json
+import os
+import shutil
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from filtering import InvertedIndex
+from year_index import YearRangeIndex
+
+DATASET_DIR = "./src/dataset"
+CACHE_DIR = os.path.join(DATASET_DIR, ".cache")
+
+# Bump when the typed layout of any dataset changes so old stores are not
+# read with the new column list
+CACHE_VERSION = 3
+
+# Column store manifest, written last so its presence marks a complete store
+MANIFEST = 'columns.json'
+
+# cleaned_data.csv and greenhouse.csv share the OECD long format. Their text
+# columns repeat a few labels each, so they are stored as categoricals: one
+# small lookup table per column plus integer codes per row.
+OECD_DTYPES = {
+    'REF_AREA': 'category',
+    'Reference area': 'category',
+    'MEASURE': 'category',
+    'Measure': 'category',
+    'EROSION_LEVEL': 'category',
+    'Erosion risk level': 'category',
+    'WATER_TYPE': 'category',
+    'Water type': 'category',
+    'NUTRIENTS': 'category',
+    'Nutrients': 'category',
+    'UNIT_MEASURE': 'category',
+    'Unit of measure': 'category',
+    'TIME_PERIOD': 'int64',
+    'OBS_VALUE': 'float64',
+    'OBS_STATUS': 'category',
+    'Observation status': 'category',
+    'UNIT_MULT': 'int64',
+    'Unit multiplier': 'category',
+    'BASE_PER': 'float64',
+}
+
+# greenhouse.csv has blank separator rows, so its integer columns hold NaN
+GHG_DTYPES = {
+    **OECD_DTYPES,
+    'TIME_PERIOD': 'float64',
+    'UNIT_MULT': 'float64',
+}
+
+
+# Greenhouse MEASURE codes by emission category. A code matches the first
+# category whose marker it contains; codes without a marker are TOTAL.
+MEASURE_CATEGORIES = ['TOTAL', 'LULUCF', 'AGR', 'TOTGHG']
+
+MEASURE_CATEGORY_MARKERS = [('TOTGHG', 'TOTGHG'), ('LULUCF', 'LULUCF'), ('AGR', 'AGR')]
+
+AGGREGATE_REGION_PATTERN = "World|EU|Total"
+
+
+def measure_category(code):
+    for marker, category in MEASURE_CATEGORY_MARKERS:
+        if marker in code:
+            return category
+
+    return 'TOTAL'
+
+
+def _prepare_greenhouse(df):
+    """Classify measures and regions once, so pages filter on codes instead
+    of running regexes over every row"""
+    lookup = np.array([
+        MEASURE_CATEGORIES.index(measure_category(code))
+        for code in df['MEASURE'].cat.categories
+    ], dtype='int8')
+    codes = df['MEASURE'].cat.codes.to_numpy()
+    total = MEASURE_CATEGORIES.index('TOTAL')
+    df['MEASURE_CATEGORY'] = pd.Categorical.from_codes(
+        np.where(codes >= 0, lookup[codes], total), categories=MEASURE_CATEGORIES
+    )
+
+    df['IS_AGGREGATE_REGION'] = df['Reference area'].str.contains(AGGREGATE_REGION_PATTERN, na=False).astype(bool)
+
+    return df
+
+
+# Rows parsed at a time by the streaming reader
+CHUNK_ROWS = 50000
+
+LAND_NUMERIC = ['Time', 'OBS_VALUE', 'Actual area (ha)']
+EROSION_NUMERIC = ['Time', 'OBS_VALUE', 'UNIT_MULT']
+
+
+def _prepare_land(df):
+    """Drop malformed land type rows"""
+    return df[df['Types of Land'].notna() & ~df['Types of Land'].isin(['Types of Land', 'HA'])]
+
+
+# Datasets with 'numeric' columns are streamed: see read_csv_chunked
+DATASETS = {
+    'nutrients': {'file': 'cleaned_data.csv', 'dtype': OECD_DTYPES},
+    'greenhouse': {'file': 'greenhouse.csv', 'dtype': GHG_DTYPES, 'prepare': _prepare_greenhouse},
+    'land': {'file': 'land_data.csv', 'numeric': LAND_NUMERIC, 'prepare': _prepare_land},
+    'erosion': {'file': 'erosion_data.csv', 'numeric': EROSION_NUMERIC},
+}
+
+
+def csv_path(name):
+    return os.path.join(DATASET_DIR, DATASETS[name]['file'])
+
+
+def cache_path(name):
+    """Directory of the dataset's column store"""
+    stem = os.path.splitext(DATASETS[name]['file'])[0]
+    return os.path.join(CACHE_DIR, f"{stem}.v{CACHE_VERSION}")
+
+
+def read_csv(name):
+    """Parse a dataset from its CSV with its dtypes and preprocessing applied"""
+    spec = DATASETS[name]
+    if 'numeric' in spec:
+        df, text_dtypes = read_csv_chunked(name)
+        return df.astype(text_dtypes)
+
+    df = pd.read_csv(csv_path(name), dtype=spec.get('dtype'))
+
+    if 'prepare' in spec:
+        df = spec['prepare'](df)
+
+    return df
+
+
+def read_csv_chunked(name, chunk_rows=CHUNK_ROWS):
+    """Parse a dataset CSV `chunk_rows` rows at a time.
+
+    The parser encodes the text columns of each chunk as categoricals, and
+    each chunk has its 'numeric' columns coerced (unparseable values become
+    NaN) and its rows filtered by 'prepare' before the next is read, so the
+    file's text is never held row by row all at once. Returns the joined
+    frame, with the text columns still encoded, and the dtypes they decode
+    to; decoded, it matches parsing the whole file and coercing it
+    afterwards, row labels included.
+    """
+    spec = DATASETS[name]
+    numeric = spec['numeric']
+    empty = pd.read_csv(csv_path(name), nrows=0, dtype='str')
+    header = empty.columns
+    text = {column: 'category' for column in header if column not in numeric}
+
+    # The dtype a whole-file parse gives text. A chunk where a column is
+    # blank throughout has labels of another dtype, which would not join.
+    text_dtype = empty.dtypes.iloc[0]
+    text_dtypes = {column: text_dtype for column in text}
+
+    chunks = []
+    for chunk in pd.read_csv(csv_path(name), dtype=text, chunksize=chunk_rows):
+        for column in numeric:
+            chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+        if 'prepare' in spec:
+            chunk = spec['prepare'](chunk)
+
+        for column in text:
+            labels = chunk[column].cat.categories
+            if labels.dtype != text_dtype:
+                chunk[column] = chunk[column].cat.set_categories(labels.astype(text_dtype))
+
+        # Empty chunks are kept too: their dtypes still count towards the
+        # numeric columns' common dtype, as they would in a whole-file parse
+        chunks.append({column: chunk[column] for column in header})
+
+    index = pd.Index(np.concatenate([chunk[header[0]].index.to_numpy() for chunk in chunks]))
+    if index.equals(pd.RangeIndex(len(index))):
+        index = pd.RangeIndex(len(index))
+
+    columns = {}
+    for column in header:
+        parts = [chunk.pop(column) for chunk in chunks]
+        if column in text:
+            values = pd.api.types.union_categoricals(parts, ignore_order=True)
+            if not len(values.categories):
+                # Blank throughout: a whole-file parse reads it as float NaN
+                values = np.full(len(index), np.nan)
+                del text_dtypes[column]
+        else:
+            values = pd.concat(parts).to_numpy()
+        columns[column] = pd.Series(values, index=index)
+
+    return pd.DataFrame(columns, copy=False), text_dtypes
+
+
+def _write_column(directory, position, series, text_dtype=None):
+    """Save one column as an .npy array and return its manifest entry.
+    `text_dtype` marks a categorical column as encoded text of that dtype."""
+    entry = {'name': series.name, 'file': f"{position}.npy"}
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype) and text_dtype is None:
+        values = series.cat.codes.to_numpy()
+        entry.update(kind='category', categories=dtype.categories.tolist(), ordered=bool(dtype.ordered))
+    elif dtype.kind in 'biuf':
+        values = series.to_numpy()
+        entry['kind'] = 'number'
+    else:
+        # Text columns are stored as codes too, and decoded on load
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes, labels = series.cat.codes.to_numpy(), dtype.categories
+        else:
+            codes, labels = pd.factorize(series)
+            text_dtype = dtype
+        # Signed even without labels, so the missing code -1 survives
+        values = codes.astype(np.min_scalar_type(-max(len(labels), 1)))
+        entry.update(kind='text', categories=labels.tolist(), dtype=str(text_dtype))
+
+    np.save(os.path.join(directory, entry['file']), values)
+    return entry
+
+
+def build_cache(name):
+    """Convert a dataset CSV into its column store"""
+    path = cache_path(name)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Write under a private name first so concurrent workers never read a
+    # half-written store
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    if 'numeric' in DATASETS[name]:
+        # Streamed text stays encoded all the way into the store
+        df, text_dtypes = read_csv_chunked(name)
+    else:
+        df, text_dtypes = read_csv(name), {}
+
+    manifest = {
+        'rows': len(df),
+        'columns': [
+            _write_column(tmp_path, i, df[column], text_dtypes.get(column))
+            for i, column in enumerate(df.columns)
+        ],
+        'index': None,
+    }
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        np.save(os.path.join(tmp_path, 'index.npy'), df.index.to_numpy())
+        manifest['index'] = 'index.npy'
+
+    with open(os.path.join(tmp_path, MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+
+    # Unlinking the old store leaves arrays other processes mapped intact
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another worker put its store in place first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return path
+
+
+def is_stale(name):
+    manifest = os.path.join(cache_path(name), MANIFEST)
+    return not os.path.exists(manifest) or os.path.getmtime(manifest) < os.path.getmtime(csv_path(name))
+
+
+def _map_array(path):
+    """Read-only view of an .npy file's data, backed by the page cache.
+    A plain ndarray view, so results computed from it are not np.memmap."""
+    return np.load(path, mmap_mode='r').view(np.ndarray)
+
+
+def _read_column(directory, entry):
+    values = _map_array(os.path.join(directory, entry['file']))
+
+    if entry['kind'] == 'category':
+        dtype = pd.CategoricalDtype(entry['categories'], ordered=entry['ordered'])
+        return pd.Categorical.from_codes(values, dtype=dtype)
+    if entry['kind'] == 'text':
+        # Decoded labels live on this process's heap; only the codes are shared
+        return pd.Categorical.from_codes(values, entry['categories']).astype(entry['dtype'])
+
+    return values
+
+
+def read_cache(name, columns=None):
+    """Frame over the memory-mapped arrays of a dataset's column store"""
+    path = cache_path(name)
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    entries = {entry['name']: entry for entry in manifest['columns']}
+    index = None
+    if manifest['index']:
+        index = _map_array(os.path.join(path, manifest['index']))
+
+    # copy=False keeps the columns backed by the mapped arrays
+    return pd.DataFrame(
+        {column: _read_column(path, entries[column]) for column in (columns or entries)},
+        index=index, copy=False
+    )
+
+
+def dataset_version(name):
+    """Changes whenever the source CSV does; usable as a cache key"""
+    return os.path.getmtime(csv_path(name))
+
+
+def load_dataset(name, columns=None):
+    """Load a dataset, optionally restricted to `columns`.
+
+    Raises FileNotFoundError if the source CSV is missing.
+    """
+    mtime = dataset_version(name)
+    return _load_dataset(name, mtime, tuple(columns) if columns else None)
+
+
+@lru_cache(maxsize=16)
+def _load_dataset(name, mtime, columns):
+    # `mtime` is only part of the cache key, so an edited CSV gets a new entry
+    if is_stale(name):
+        build_cache(name)
+
+    return read_cache(name, columns)
+
+
+def load_aggregate(name, keys, value='OBS_VALUE', where=None):
+    """Sum `value` over `keys`, computed once per dataset version.
+
+    `where` maps a column to the values to keep before aggregating. Groups
+    keep the order in which they first appear in the dataset.
+    """
+    mtime = dataset_version(name)
+    where = tuple((column, tuple(values)) for column, values in (where or {}).items())
+    return _load_aggregate(name, mtime, tuple(keys), value, where)
+
+
+@lru_cache(maxsize=16)
+def _load_aggregate(name, mtime, keys, value, where):
+    columns = keys + (value,) + tuple(column for column, _ in where if column not in keys)
+    data = _load_dataset(name, mtime, tuple(dict.fromkeys(columns)))
+
+    for column, values in where:
+        data = data[data[column].isin(values)]
+
+    aggregate = data.groupby(list(keys), observed=True, sort=False, as_index=False)[value].sum()
+
+    # Drop the labels filtered out above from categorical lookup tables
+    for column in keys:
+        if isinstance(aggregate[column].dtype, pd.CategoricalDtype):
+            aggregate[column] = aggregate[column].cat.remove_unused_categories()
+
+    return aggregate
+
+
+def load_year_index(name, keys, where=None):
+    """YearRangeIndex of OBS_VALUE over TIME_PERIOD for `keys`, built once per
+    dataset version"""
+    mtime = dataset_version(name)
+    where = tuple((column, tuple(values)) for column, values in (where or {}).items())
+    return _load_year_index(name, mtime, tuple(keys), where)
+
+
+@lru_cache(maxsize=16)
+def _load_year_index(name, mtime, keys, where):
+    data = _load_aggregate(name, mtime, keys + ('TIME_PERIOD',), 'OBS_VALUE', where)
+    return YearRangeIndex(data, list(keys))
+
+
+def load_index(name, columns, aggregate_keys=None, where=None):
+    """InvertedIndex over `columns` of a dataset, built once per dataset
+    version. With `aggregate_keys` it indexes
+    load_aggregate(name, aggregate_keys, where=where) instead."""
+    mtime = dataset_version(name)
+    where = tuple((column, tuple(values)) for column, values in (where or {}).items())
+    keys = tuple(aggregate_keys) if aggregate_keys else None
+    return _load_index(name, mtime, tuple(columns), keys, where)
+
+
+@lru_cache(maxsize=16)
+def _load_index(name, mtime, columns, keys, where):
+    if keys:
+        data = _load_aggregate(name, mtime, keys, 'OBS_VALUE', where)
+    else:
+        data = _load_dataset(name, mtime, None)
+
+    return InvertedIndex(data, list(columns))
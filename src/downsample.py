@@ -0,0 +1,105 @@
+"""Server-side downsampling of long line traces
+
+A line chart cannot show more distinct points than it has horizontal pixels,
+so sending more only grows the figure JSON and the browser's drawing work.
+`downsample_figure` caps every line trace of a figure at a point budget
+derived from the chart width, picking the points to keep with
+largest-triangle-three-buckets (LTTB), which preserves peaks and troughs.
+Traces already under the budget, and traces whose x values are not sorted
+numbers, are left untouched.
+
+The server never learns how wide the browser draws a chart, so the budget
+comes from `chart_width`, the width assumed for a full-width chart. Set
+`enabled` to False to send every point, e.g. for exports meant to be
+zoomed into.
+"""
+import numpy as np
+
+# Width in CSS pixels of a full-width chart on the pages' wide layout
+CHART_WIDTH = 1200
+
+# Process-wide settings; figures already cached keep the points they got
+enabled = True
+chart_width = CHART_WIDTH
+
+# Horizontal pixels allotted to each point kept
+PIXELS_PER_POINT = 2
+
+# Per-point trace attributes that must follow the points kept
+POINT_ATTRIBUTES = ('customdata', 'text', 'hovertext')
+
+
+def is_sorted(x):
+    """Whether `x` holds numbers in ascending order, as LTTB needs"""
+    x = np.asarray(x)
+    return x.dtype.kind in 'iuf' and bool((x[1:] >= x[:-1]).all())
+
+
+def lttb(x, y, n_out):
+    """Indices of the `n_out` points of (x, y) chosen by
+    largest-triangle-three-buckets. Always keeps the first and last point.
+
+    Raises ValueError unless `x` is numeric and sorted ascending.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    if not is_sorted(x):
+        raise ValueError("LTTB needs x values sorted in ascending order")
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # The inner points are split into n_out - 2 buckets, one kept per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket, or the last point for the final bucket
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        keep[i + 1] = a
+
+    return keep
+
+
+def downsample_figure(fig, share=1.0, columns=1):
+    """Cap the points of every line trace of `fig` in place, unless
+    downsampling is disabled.
+
+    `share` is the fraction of `chart_width` the chart takes up, and
+    `columns` the number of facet columns splitting it. Returns `fig`.
+    """
+    if not enabled:
+        return fig
+
+    max_points = max(int(chart_width * share / max(columns, 1) / PIXELS_PER_POINT), 3)
+
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or trace.x is None or trace.y is None:
+            continue
+        if len(trace.x) <= max_points or not is_sorted(trace.x):
+            continue
+
+        keep = lttb(trace.x, trace.y, max_points)
+        updates = {'x': np.asarray(trace.x)[keep], 'y': np.asarray(trace.y)[keep]}
+        for name in POINT_ATTRIBUTES:
+            values = trace[name]
+            if values is not None and not isinstance(values, str) and len(values) == len(trace.x):
+                updates[name] = np.asarray(values)[keep]
+        trace.update(updates)
+
+    return fig
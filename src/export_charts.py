@@ -0,0 +1,210 @@
+"""Export the land and erosion charts to files without a Streamlit server
+
+    python src/export_charts.py --output exported --jobs 4
+
+Builds every chart of the land and erosion pages for each combination of a
+country selection and a year range, and writes one file per chart:
+
+    <output>/<page>/<countries>/<start>-<end>/<chart>.json
+
+Files are Plotly figure JSON, or static images with --format png or svg
+(which needs the kaleido package). The country selections are the page's
+default selection, all countries and every single country (or those given
+with --countries); the year ranges are the full range and each decade (or
+those given with --years). Line charts are downsampled as on the pages
+unless --full-resolution is given. Views are built in parallel over a
+process pool, and <output>/index.json lists every file written. Run it
+from the repository root.
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import downsample
+from data_access import load_dataset
+from figure_emit import compact_figure
+from page_filters import filter_erosion, filter_land, load_erosion_index, load_land_index
+
+# Per page: the module holding its chart builders, its dataset, the builders
+# to export, and how many countries the page selects by default
+PAGES = {
+    'land': {
+        'figures': 'figures.land',
+        'dataset': 'land',
+        'charts': [
+            'create_stacked_area_chart',
+            'create_land_composition_pie_chart',
+            'create_temporal_trends_chart',
+            'create_country_comparison_chart',
+            'create_top_countries_chart',
+            'create_heatmap_chart',
+            'create_map_chart',
+        ],
+        'default_countries': 8,
+    },
+    'erosion': {
+        'figures': 'figures.erosion',
+        'dataset': 'erosion',
+        'charts': [
+            'create_time_series_chart',
+            'create_erosion_comparison_chart',
+            'create_severity_breakdown_chart',
+        ],
+        'default_countries': 5,
+    },
+}
+
+FORMATS = ['json', 'png', 'svg']
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def filter_view(page, df, countries, years):
+    """The page's filters with every other filter left open"""
+    if page == 'land':
+        return filter_land(df, countries, years, [], load_land_index())
+
+    return filter_erosion(df, countries, years, [], [], load_erosion_index())
+
+
+def export_view(page, label, countries, years, output, fmt):
+    """Build and write every chart of one view; returns the files written
+    and the charts the builders could not draw for it, with the reason"""
+    spec = PAGES[page]
+    figures = importlib.import_module(spec['figures'])
+    data = filter_view(page, load_dataset(spec['dataset']), countries, years)
+
+    directory = os.path.join(output, page, label, f"{years[0]}-{years[1]}")
+    os.makedirs(directory, exist_ok=True)
+
+    files, skipped = [], {}
+    for chart in spec['charts']:
+        try:
+            fig = compact_figure(getattr(figures, chart)(data))
+        except ValueError as e:
+            # e.g. one facet per country does not fit all countries
+            skipped[chart] = str(e).splitlines()[0]
+            continue
+
+        path = os.path.join(directory, f"{chart}.{fmt}")
+        if fmt == 'json':
+            with open(path, 'w') as f:
+                f.write(fig.to_json())
+        else:
+            fig.write_image(path, format=fmt)
+        files.append(path)
+
+    return files, skipped
+
+
+def configure_worker(full_resolution):
+    downsample.enabled = not full_resolution
+
+
+def country_selections(page, df, only=None):
+    """(label, countries) pairs to export; an empty list selects all.
+    Labels name directories, so countries whose names slug alike get a
+    numbered suffix rather than sharing one."""
+    countries = sorted(df['Country'].unique())
+    selections = [
+        ('default', countries[:PAGES[page]['default_countries']]),
+        ('all', []),
+    ]
+    used = {label for label, _ in selections}
+    for country in countries:
+        if only and country not in only:
+            continue
+        label = base = slug(country)
+        suffix = 2
+        while label in used:
+            label = f"{base}-{suffix}"
+            suffix += 1
+        used.add(label)
+        selections.append((label, [country]))
+
+    return selections
+
+
+def year_ranges(df, ranges=None):
+    """The requested ranges, or the full range followed by each decade"""
+    first, last = int(df['Time'].min()), int(df['Time'].max())
+    if ranges:
+        return ranges
+
+    decades = [
+        (max(start, first), min(start + 9, last))
+        for start in range(first - first % 10, last + 1, 10)
+    ]
+    return [(first, last)] + [years for years in decades if years != (first, last)]
+
+
+def parse_range(text):
+    start, _, end = text.partition('-')
+    try:
+        return int(start), int(end or start)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START-END, got {text!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help=f"pages to export (default: {', '.join(PAGES)})")
+    parser.add_argument('--output', default='exported', help="directory to write the files to")
+    parser.add_argument('--format', choices=FORMATS, default='json', help="file format of the charts")
+    parser.add_argument('--countries', nargs='+', help="single countries to export (default: all of them)")
+    parser.add_argument('--years', nargs='+', type=parse_range, help="year ranges as START-END (default: full range and each decade)")
+    parser.add_argument('--full-resolution', action='store_true', help="keep every point of the line charts")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="worker processes")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.pages) - set(PAGES)
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(sorted(unknown))}")
+    if args.format != 'json' and importlib.util.find_spec('kaleido') is None:
+        parser.error(f"--format {args.format} needs the kaleido package")
+
+    views = []
+    for page in args.pages or list(PAGES):
+        df = load_dataset(PAGES[page]['dataset'])
+        for label, countries in country_selections(page, df, args.countries):
+            for years in year_ranges(df, args.years):
+                views.append((page, label, countries, years))
+
+    start = time.perf_counter()
+    index = []
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=configure_worker, initargs=(args.full_resolution,)) as pool:
+        futures = {
+            pool.submit(export_view, page, label, countries, years, args.output, args.format): (page, label, countries, years)
+            for page, label, countries, years in views
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            page, label, countries, years = futures[future]
+            files, skipped = future.result()
+            index.append({
+                'page': page,
+                'countries': countries,
+                'years': list(years),
+                'files': [os.path.relpath(path, args.output) for path in files],
+                'skipped': skipped,
+            })
+            print(f"[{done}/{len(views)}] {page} {label} {years[0]}-{years[1]}", file=sys.stderr)
+            for chart, reason in skipped.items():
+                print(f"    skipped {chart}: {reason}", file=sys.stderr)
+
+    index.sort(key=lambda view: (view['page'], view['countries'], view['years']))
+    with open(os.path.join(args.output, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+
+    print(f"exported {len(views)} views in {time.perf_counter() - start:.1f} s to {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Per-session memoization of Plotly figures
+
+Chart builders decorated with `cached_figure` return the figure built for
+the same inputs earlier in the session instead of rebuilding it on every
+rerun. Each session keeps its own LRU cache in st.session_state, bounded by
+entry count and by an estimate of the figures' memory use. Outside a
+Streamlit session the builders run uncached.
+
+`build_concurrently` fills the cache for several builder calls at once from
+a thread pool, so a page can build its figures in parallel up front and
+still draw them one by one in layout order.
+"""
+import functools
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from figure_emit import compact_figure
+
+SESSION_KEY = '_figure_cache'
+
+MAX_ENTRIES = 64
+
+MAX_BYTES = 64 * 1024 * 1024
+
+# Set to a list to record (builder name, seconds) for every figure actually
+# built; used by the benchmark harness
+build_log = None
+
+
+class FigureCache:
+    """LRU mapping of input hash to figure, bounded by count and size"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, fig):
+        if key in self.entries:
+            self.size -= self.entries.pop(key)[1]
+
+        size = figure_size(fig)
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = (fig, size)
+        self.size += size
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+def figure_size(fig):
+    """Rough memory footprint of a figure's data and layout in bytes"""
+    return _value_size(fig.to_plotly_json())
+
+
+def _value_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes if value.dtype != object else sum(_value_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(len(k) + _value_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_size(v) for v in value) + 8 * len(value)
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+def input_digest(value, hasher):
+    """Feed a stable representation of a builder argument into `hasher`"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        hasher.update(repr((type(value).__name__, value.shape)).encode())
+        if isinstance(value, pd.DataFrame):
+            hasher.update(repr(list(value.columns)).encode())
+        hasher.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        hasher.update(repr((value.dtype.str, value.shape)).encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            input_digest(item, hasher)
+    elif isinstance(value, dict):
+        hasher.update(f"dict{len(value)}".encode())
+        for key, item in value.items():
+            input_digest(key, hasher)
+            input_digest(item, hasher)
+    else:
+        hasher.update(repr(value).encode())
+
+
+def session_cache():
+    """The current session's FigureCache, or None outside a Streamlit run"""
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = FigureCache()
+
+    return st.session_state[SESSION_KEY]
+
+
+def cached_figure(func):
+    """Memoize a figure builder per session on a hash of its arguments.
+
+    Built figures are passed through compact_figure once, before caching, so
+    every rerun sends them as typed arrays. The returned figure is shared
+    with later reruns, so callers must not modify it.
+    """
+    name = func.__qualname__
+
+    def build(args, kwargs):
+        if build_log is None:
+            return compact_figure(func(*args, **kwargs))
+
+        start = time.perf_counter()
+        fig = compact_figure(func(*args, **kwargs))
+        build_log.append((name, time.perf_counter() - start))
+        return fig
+
+    def cache_key(args, kwargs):
+        hasher = hashlib.blake2b(f"{func.__module__}.{func.__qualname__}".encode())
+        input_digest(args, hasher)
+        input_digest(kwargs, hasher)
+        return hasher.hexdigest()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = session_cache()
+        if cache is None:
+            return build(args, kwargs)
+
+        key = cache_key(args, kwargs)
+        fig = cache.get(key)
+        if fig is None:
+            fig = build(args, kwargs)
+            cache.put(key, fig)
+
+        return fig
+
+    # Used by build_concurrently
+    wrapper.build = build
+    wrapper.cache_key = cache_key
+    return wrapper
+
+
+def build_concurrently(calls, max_workers):
+    """Build the figures of `calls`, (cached builder, args) pairs, on up to
+    `max_workers` threads and store them in the session's cache.
+
+    The builders run without the script's context, so only session-free work
+    happens on the threads; the cache is read and filled here. Calls whose
+    figure is already cached are skipped. Does nothing outside a Streamlit
+    session or with fewer than two figures to build.
+    """
+    cache = session_cache()
+    if cache is None or max_workers < 2:
+        return
+
+    pending = {}
+    for builder, args in calls:
+        key = builder.cache_key(args, {})
+        if key not in pending and cache.get(key) is None:
+            pending[key] = (builder, args)
+
+    if len(pending) < 2:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        futures = {
+            key: pool.submit(builder.build, args, {})
+            for key, (builder, args) in pending.items()
+        }
+
+    for key, future in futures.items():
+        cache.put(key, future.result())
@@ -0,0 +1,112 @@
+"""Compact serialization of Plotly figures for st.plotly_chart
+
+Plotly (6 and later) sends numpy arrays to the browser as base64 typed
+arrays instead of JSON number lists, and shrinks int64 arrays to the
+smallest integer type that holds them. Plain Python lists and float
+columns that only hold whole numbers miss out on that. `compact_figure`
+converts every numeric data array of a figure to the narrowest numpy dtype
+that represents its values exactly, so the whole figure goes out in the
+compact form. `plotly_chart` is st.plotly_chart with optional measurement
+of the payload it sends.
+"""
+import time
+
+import numpy as np
+
+from lazy_import import lazy_import
+
+pio = lazy_import('plotly.io')
+# Only plotly_chart needs Streamlit, so the headless exporter never loads it
+st = lazy_import('streamlit')
+
+# Set to a list to record (chart title, payload bytes, serialization
+# seconds) for every chart sent; used by the benchmark harness
+emit_log = None
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+# A typed array spec costs more than a JSON list of a few numbers
+MIN_TYPED_LENGTH = 8
+
+
+def compact_array(values):
+    """`values` as the narrowest numpy array holding them exactly, or None
+    when they are not numeric"""
+    if isinstance(values, str):
+        return None
+    if isinstance(values, (list, tuple)) and len(values) < MIN_TYPED_LENGTH:
+        return None
+
+    array = np.asarray(values)
+    if array.size == 0 or array.dtype.kind not in 'iuf':
+        return None
+
+    if array.dtype.kind == 'f':
+        finite = np.isfinite(array)
+        if finite.all() and (array == np.round(array)).all() \
+                and array.min() >= INT32_MIN and array.max() <= INT32_MAX:
+            # Plotly narrows int64 further to int8/16/32 on encoding
+            return array.astype('int64')
+
+        narrow = array.astype('float32')
+        with np.errstate(invalid='ignore'):
+            exact = (narrow.astype(array.dtype) == array) | ~finite
+        if array.dtype.itemsize > 4 and exact.all():
+            return narrow
+
+    return array
+
+
+def _array_paths(props, path=()):
+    """(path, value) of every list or array in a trace's plotly JSON"""
+    for prop, value in props.items():
+        if isinstance(value, dict):
+            yield from _array_paths(value, path + (prop,))
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            yield path + (prop,), value
+
+
+def _compact_trace(trace):
+    """Convert the numeric data arrays of `trace` in place"""
+    for path, values in list(_array_paths(trace.to_plotly_json())):
+        array = compact_array(values)
+        if array is None:
+            continue
+
+        # Plotly ignores assignments equal in value to the current one,
+        # so clear the property before retyping it
+        trace[path] = None
+        try:
+            trace[path] = array
+        except ValueError:
+            # Not a property that takes an array after all
+            trace[path] = values
+
+
+def compact_figure(fig):
+    """Convert the numeric data arrays of every trace of `fig`, animation
+    frames included, in place so they serialize as typed arrays. Returns
+    `fig`."""
+    for trace in fig.data:
+        _compact_trace(trace)
+    for frame in fig.frames:
+        for trace in frame.data:
+            _compact_trace(trace)
+
+    return fig
+
+
+def payload_stats(fig):
+    """(bytes, seconds) of serializing `fig` the way st.plotly_chart does"""
+    start = time.perf_counter()
+    payload = pio.to_json(fig, validate=False)
+    return len(payload.encode()), time.perf_counter() - start
+
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart that records the payload in `emit_log` when set"""
+    if emit_log is not None:
+        title = fig.layout.title.text or (fig.data[0].type if fig.data else 'figure')
+        emit_log.append((title, *payload_stats(fig)))
+
+    return st.plotly_chart(fig, **kwargs)
@@ -0,0 +1,7 @@
+"""Chart builders of every page, free of Streamlit
+
+Each module turns the filtered data of one page into Plotly figures without
+calling st.*, so the builders can be timed, exported or run off the script
+thread. The pages wrap them with cached_figure and draw the results with
+plotly_chart.
+"""
@@ -0,0 +1,95 @@
+"""Erosion figures: filtered rows of the erosion dataset in, Plotly figures out"""
+from downsample import downsample_figure
+from figures import fastpx
+from lazy_import import lazy_import
+
+# Imported when the first figure is built
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
+
+def create_time_series_chart(df):
+    """Create interactive time series chart"""
+    if df.empty:
+        return go.Figure()
+    
+    # Aggregate data for total erosion by country and year
+    total_data = df[df['EROSION_LEVEL'] == '_T'].groupby(['Country', 'Time', 'Types of Erosion'])['OBS_VALUE'].sum().reset_index()
+    
+    fig = fastpx.line(
+        total_data, 
+        x='Time', 
+        y='OBS_VALUE',
+        color='Country',
+        facet_col='Types of Erosion',
+        title='📈 Erosion Trends Over Time (Total Erosion %)',
+        labels={'OBS_VALUE': 'Percentage of Agricultural Land (%)', 'Time': 'Year'}
+    )
+    
+    fig.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=6))
+    fig.update_layout(
+        height=500,
+        showlegend=True,
+        hovermode='x unified',
+        font=dict(size=12)
+    )
+    
+    return downsample_figure(fig, columns=total_data['Types of Erosion'].nunique())
+
+def create_erosion_comparison_chart(df):
+    """Create wind vs water erosion comparison"""
+    if df.empty:
+        return go.Figure()
+    
+    # Get total erosion data
+    total_data = df[df['EROSION_LEVEL'] == '_T'].groupby(['Country', 'Types of Erosion'])['OBS_VALUE'].mean().reset_index()
+    
+    fig = fastpx.bar(
+        total_data,
+        x='Country',
+        y='OBS_VALUE',
+        color='Types of Erosion',
+        title='🌪️ Wind vs Water Erosion Comparison (Average %)',
+        labels={'OBS_VALUE': 'Average Percentage of Agricultural Land (%)'},
+        barmode='group'
+    )
+    
+    fig.update_layout(
+        height=500,
+        xaxis_tickangle=-45,
+        showlegend=True,
+        font=dict(size=12)
+    )
+    
+    return fig
+
+def create_severity_breakdown_chart(df):
+    """Create severity level breakdown chart"""
+    if df.empty:
+        return go.Figure()
+    
+    # Filter out total values and aggregate by severity
+    severity_data = df[~df['EROSION_LEVEL'].isin(['_T', 'TOL'])].groupby(['EROSION_LEVEL', 'Erosion risk level'])['OBS_VALUE'].mean().reset_index()
+    
+    # Create a mapping for better labels
+    severity_mapping = {
+        'LW': 'Low',
+        'MD': 'Moderate', 
+        'HG': 'High',
+        'SV': 'Severe'
+    }
+    
+    severity_data['Severity_Label'] = severity_data['EROSION_LEVEL'].map(severity_mapping)
+    
+    fig = px.pie(
+        severity_data,
+        values='OBS_VALUE',
+        names='Severity_Label',
+        title='🎯 Global Erosion Severity Distribution',
+        color_discrete_sequence=px.colors.sequential.Reds_r
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=500, font=dict(size=12))
+    
+    return fig
@@ -0,0 +1,252 @@
+"""Plotly Express line and bar charts without the per-trace validation
+
+px.line and px.bar validate every property of every trace they create, and
+lay out facets through make_subplots, which validates each axis again. For
+charts with dozens of traces that is most of their build time. `line` and
+`bar` here take the subset of px arguments the pages use, group the frame
+once with pandas, write the traces and layout as plain dicts exactly as px
+would and build the figure with validation off, so the figure serializes to
+the same JSON as the px one. Validation is back on once the figure is
+built, so later update_traces and update_layout calls coerce their values
+as usual.
+
+This leans on Plotly internals: the private `_validate` flag and the layout
+arithmetic of make_subplots. tests/test_fastpx.py compares the output with
+px for the arguments the pages use, and requirements.txt caps Plotly at
+the versions it passes on.
+"""
+import pandas as pd
+
+from lazy_import import lazy_import
+
+go = lazy_import('plotly.graph_objects')
+pio = lazy_import('plotly.io')
+
+# px switches line charts to WebGL traces above this many rows
+WEBGL_MIN_ROWS = 1000
+
+# px's facet spacing defaults
+FACET_COL_SPACING = 0.02
+FACET_ROW_SPACING = 0.03
+FACET_ROW_SPACING_WRAPPED = 0.07
+
+
+def line(df, x, y, color, facet_col=None, facet_col_wrap=0, title=None,
+         labels=None, color_discrete_sequence=None):
+    """px.line(df, x, y, color, ...) for a long-form frame"""
+    trace_type = 'scattergl' if len(df) > WEBGL_MIN_ROWS else 'scatter'
+
+    def style(trace, color_value):
+        trace['line'] = {'color': color_value, 'dash': 'solid'}
+        trace['marker'] = {'symbol': 'circle'}
+        trace['mode'] = 'lines'
+        if trace_type == 'scatter':
+            trace['orientation'] = 'v'
+
+    return _figure(
+        df, trace_type, style, x, y, color, facet_col, facet_col_wrap,
+        title, labels or {}, color_discrete_sequence, {}, [], {},
+    )
+
+
+def bar(df, x, y, color, orientation='v', barmode='relative', title=None,
+        labels=None, hover_data=None, color_discrete_sequence=None,
+        color_discrete_map=None):
+    """px.bar(df, x, y, color, ...) for a long-form frame"""
+    def style(trace, color_value):
+        trace['marker'] = {'color': color_value, 'pattern': {'shape': ''}}
+        trace['orientation'] = orientation
+        trace['textposition'] = 'auto'
+        if barmode == 'group':
+            trace['alignmentgroup'] = 'True'
+            trace['offsetgroup'] = trace['name']
+
+    return _figure(
+        df, 'bar', style, x, y, color, None, 0, title, labels or {},
+        color_discrete_sequence, color_discrete_map or {}, hover_data or [],
+        {'barmode': barmode},
+    )
+
+
+def _first_seen(values):
+    """Distinct non-null values in order of first appearance, as px orders
+    groups"""
+    return list(pd.unique(values[pd.notna(values)]))
+
+
+def _figure(df, trace_type, style, x, y, color, facet_col, facet_col_wrap,
+            title, labels, sequence, color_map, hover_data, layout):
+    label = lambda column: labels.get(column, column)
+
+    columns = {column: df[column].to_numpy() for column in {x, y, color, *hover_data}}
+    grouper = [color] if facet_col is None else [color, facet_col]
+    orders = {column: _first_seen(df[column].to_numpy()) for column in grouper}
+
+    # Colors are handed out in order of appearance, after any fixed ones
+    if sequence is None:
+        sequence = pio.templates[pio.templates.default].layout.colorway
+    colors = dict(color_map)
+    for value in orders[color]:
+        if value not in colors:
+            colors[value] = sequence[len(colors) % len(sequence)]
+
+    facets = orders.get(facet_col, [None])
+    if not facets:
+        # No rows to facet: px falls back to a single subplot
+        nrows, ncols = 1, 1
+    elif facet_col_wrap:
+        nrows, ncols = -(-len(facets) // facet_col_wrap), min(len(facets), facet_col_wrap)
+    else:
+        nrows, ncols = 1, len(facets)
+    layout.update(_facet_layout(
+        nrows, ncols, facet_col_wrap, [f"{label(facet_col)}={value}" for value in facets]
+        if facet_col is not None else [],
+    ))
+
+    groups = df.groupby(grouper, sort=False, observed=True, dropna=True).indices
+    keys = sorted(
+        (key if isinstance(key, tuple) else (key,) for key in groups),
+        key=lambda key: [orders[column].index(value) for column, value in zip(grouper, key)],
+    )
+
+    hover_tail = [f"{label(x)}=%{{x}}", f"{label(y)}=%{{y}}"] + [
+        f"{label(column)}=%{{customdata[{i}]}}" for i, column in enumerate(hover_data)
+    ]
+
+    traces, named = [], set()
+    for key in keys:
+        rows = groups[key if len(key) > 1 else key[0]]
+        name = str(key[0])
+        hover = [f"{label(column)}={value}" for column, value in zip(grouper, key)]
+
+        trace = {
+            'type': trace_type,
+            'name': name,
+            'legendgroup': name,
+            'showlegend': name not in named,
+            'hovertemplate': '<br>'.join(hover + hover_tail) + '<extra></extra>',
+        }
+        named.add(name)
+        style(trace, colors[key[0]])
+
+        # Facets are numbered from the top left; subplots from the bottom left
+        axis = 1
+        if facet_col is not None:
+            index = facets.index(key[1])
+            row, col = (index // facet_col_wrap, index % facet_col_wrap) if facet_col_wrap else (0, index)
+            axis = (nrows - 1 - row) * ncols + col + 1
+        trace['xaxis'] = f"x{axis if axis > 1 else ''}"
+        trace['yaxis'] = f"y{axis if axis > 1 else ''}"
+
+        trace['x'] = columns[x][rows]
+        trace['y'] = columns[y][rows]
+        if hover_data:
+            trace['customdata'] = pd.DataFrame(
+                {column: columns[column][rows] for column in hover_data}
+            ).to_numpy()
+
+        traces.append(trace)
+
+    layout['legend'] = {'tracegroupgap': 0}
+    if traces:
+        layout['legend']['title'] = {'text': label(color)}
+    if title:
+        layout['title'] = {'text': title}
+    else:
+        layout['margin'] = {'t': 60}
+
+    for name in _axis_names(nrows, ncols, 'y', first_only='col'):
+        layout[name]['title'] = {'text': label(y)}
+    for name in _axis_names(nrows, ncols, 'x', first_only='row'):
+        layout[name]['title'] = {'text': label(x)}
+
+    fig = go.Figure(data=traces, layout=layout, _validate=False)
+
+    # Children created from here on inherit the flag from their parent
+    fig._validate = fig.layout._validate = True
+    for trace in fig.data:
+        trace._validate = True
+
+    return fig
+
+
+def _axis_names(nrows, ncols, letter, first_only):
+    """Layout keys of the axes in the bottom row or the left column"""
+    cells = range(1, ncols + 1) if first_only == 'row' else range(1, nrows * ncols + 1, ncols)
+    return [f"{letter}axis{cell if cell > 1 else ''}" for cell in cells]
+
+
+def _check_spacing(count, spacing, name, argument, dimension):
+    if count > 1 and spacing > 1.0 / float(count - 1):
+        raise ValueError(
+            f"{name} spacing cannot be greater than (1 / ({dimension} - 1)) = {1.0 / float(count - 1):f}.\n"
+            f"The resulting plot would have {count} {'rows' if dimension == 'rows' else 'columns'} ({dimension}={count}).\n"
+            f"Use the {argument} argument to adjust this spacing."
+        )
+
+
+def _facet_layout(nrows, ncols, facet_col_wrap, titles):
+    """The axes and facet titles px lays out through make_subplots: a grid
+    filled from the bottom left, every axis matching the first, and tick
+    labels only on the bottom row and left column"""
+    h_spacing = FACET_COL_SPACING
+    v_spacing = FACET_ROW_SPACING_WRAPPED if facet_col_wrap else FACET_ROW_SPACING
+    _check_spacing(ncols, h_spacing, 'Horizontal', 'facet_col_spacing', 'cols')
+    _check_spacing(nrows, v_spacing, 'Vertical', 'facet_row_spacing', 'rows')
+
+    # The same float arithmetic as make_subplots, so the domains match
+    widths = [(1.0 - h_spacing * (ncols - 1)) * (1.0 / float(ncols))] * ncols
+    heights = [(1.0 - v_spacing * (nrows - 1)) * (1.0 / float(nrows))] * nrows
+
+    layout, domains = {}, []
+    for r in range(nrows):
+        for c in range(ncols):
+            x_start = sum(widths[:c]) + c * h_spacing
+            y_start = sum(heights[:r]) + r * v_spacing
+            y_end = y_start + heights[r]
+            if 1.0 < y_end < 1.01:
+                y_end = 1.0
+            x_domain = [x_start, x_start + widths[c]]
+            y_domain = [y_start, y_end]
+            domains.append((x_domain, y_domain))
+
+            cell = r * ncols + c + 1
+            suffix = cell if cell > 1 else ''
+            xaxis = {'anchor': f"y{suffix}", 'domain': x_domain}
+            yaxis = {'anchor': f"x{suffix}", 'domain': y_domain}
+            if cell > 1:
+                xaxis['matches'] = 'x'
+                yaxis['matches'] = 'y'
+                if r > 0:
+                    xaxis['showticklabels'] = False
+                if c > 0:
+                    yaxis['showticklabels'] = False
+            layout[f"xaxis{suffix}"] = xaxis
+            layout[f"yaxis{suffix}"] = yaxis
+
+    # Facet titles sit centred above their subplot, in the facets' order
+    # from the top left
+    if facet_col_wrap:
+        titles = titles + [None] * (nrows * ncols - len(titles))
+        titles = [
+            titles[(nrows - 1 - r) * ncols + c] for r in range(nrows) for c in range(ncols)
+        ]
+    annotations = [
+        {
+            'font': {},
+            'showarrow': False,
+            'text': text,
+            'x': sum(x_domain) / 2.0,
+            'xanchor': 'center',
+            'xref': 'paper',
+            'y': y_domain[1],
+            'yanchor': 'bottom',
+            'yref': 'paper',
+        }
+        for text, (x_domain, y_domain) in zip(titles, domains)
+        if text
+    ]
+    if annotations:
+        layout['annotations'] = annotations
+
+    return layout
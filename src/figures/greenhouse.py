@@ -0,0 +1,200 @@
+"""Greenhouse gas figures and the data shaping behind them, free of Streamlit
+
+The page filters the rows by its widgets; the functions here reduce them to
+what each chart plots and build the figure.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from lazy_import import lazy_import
+
+# Imported when the first figure is built
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
+# Emissions per country as a dense (year, measure, country) array, NaN where a
+# country reports nothing for that year and measure
+ChoroplethCube = namedtuple(
+    "ChoroplethCube", ["values", "years", "measures", "countries"]
+)
+
+
+def choropleth_cube(data, years, measures):
+    """Sum every (year, measure, country) group once, so the map only slices
+    the result instead of filtering and grouping the rows on each change"""
+    countries_data = data[~data["IS_AGGREGATE_REGION"]]
+    grouped = countries_data.groupby(
+        ["TIME_PERIOD", "MEASURE", "Reference area"], observed=True
+    )["OBS_VALUE"].sum()
+
+    # Countries in category order, as a groupby over one slice returns them
+    reported = set(grouped.index.get_level_values("Reference area"))
+    countries = tuple(
+        area
+        for area in countries_data["Reference area"].cat.categories
+        if area in reported
+    )
+
+    values = np.full((len(years), len(measures), len(countries)), np.nan)
+    values[
+        pd.Index(years).get_indexer(grouped.index.get_level_values("TIME_PERIOD")),
+        pd.Index(measures).get_indexer(grouped.index.get_level_values("MEASURE")),
+        pd.Index(countries).get_indexer(
+            grouped.index.get_level_values("Reference area")
+        ),
+    ] = grouped.to_numpy()
+
+    return ChoroplethCube(values, years, measures, countries)
+
+
+def emissions_over_time(df_filtered):
+    """Yearly emissions with one column per measure"""
+    return (
+        df_filtered.groupby(["TIME_PERIOD", "MEASURE"], observed=True)["OBS_VALUE"]
+        .sum()
+        .reset_index()
+        .pivot(index="TIME_PERIOD", columns="MEASURE", values="OBS_VALUE")
+    )
+
+
+def emissions_by_measure(df_filtered):
+    """Total emissions of each measure"""
+    return (
+        df_filtered.groupby("MEASURE", observed=True)["OBS_VALUE"].sum().reset_index()
+    )
+
+
+def choropleth_year(cube, gas_type, year):
+    """The countries reporting `gas_type` in `year` and their emissions"""
+    row = cube.values[cube.years.index(year), cube.measures.index(gas_type)]
+    reported = ~np.isnan(row)
+    countries = tuple(
+        country for country, shown in zip(cube.countries, reported) if shown
+    )
+    return countries, row[reported]
+
+
+def emissions_line_figure(df_plot, selected_region):
+    return px.line(
+        df_plot,
+        title=f"Greenhouse Gas Measures in {selected_region} Over Time",
+        labels={"value": "Emissions", "TIME_PERIOD": "Year"},
+    )
+
+
+def emission_pie_figure(df_grouped, selected_region, time_range, category_filter):
+    # No explode effect by default
+    fig = go.Figure(
+        go.Pie(
+            labels=df_grouped["MEASURE"],
+            values=df_grouped["OBS_VALUE"],
+            hoverinfo="label+percent+value",
+            textinfo="label+percent",
+            hole=0,
+            pull=[0] * len(df_grouped),  # no explode
+        )
+    )
+
+    fig.update_layout(
+        title=f"Emission Distribution in {selected_region} ({time_range[0]}–{time_range[1]}) – {category_filter}"
+    )
+
+    return fig
+
+
+def emissions_choropleth_figure(countries, values, gas_type, selected_year, cmap):
+    # Create choropleth map
+    fig = px.choropleth(
+        {"Reference area": countries, "OBS_VALUE": values},
+        locations="Reference area",
+        locationmode="country names",
+        color="OBS_VALUE",
+        color_continuous_scale=cmap.lower(),
+        labels={"OBS_VALUE": "Emissions"},
+        title=f"{gas_type} Emissions by Country ({selected_year})",
+    )
+
+    fig.update_geos(projection_type="natural earth")
+    fig.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0})
+
+    return fig
+
+
+def emissions_choropleth_animation(
+    countries, values, years, gas_type, start_year, cmap
+):
+    """One frame per year over a fixed location layout. Frames carry only the
+    z-values, so the browser scrubs through the years without a rerun."""
+    reported = ~np.isnan(values).all(axis=0)
+    locations = [country for country, shown in zip(countries, reported) if shown]
+    values = values[:, reported]
+    start = years.index(start_year)
+
+    fig = go.Figure(
+        data=[
+            go.Choropleth(
+                locations=locations,
+                locationmode="country names",
+                z=values[start],
+                coloraxis="coloraxis",
+                hovertemplate="Reference area=%{location}<br>Emissions=%{z}<extra></extra>",
+            )
+        ],
+        frames=[
+            go.Frame(data=[go.Choropleth(z=row)], name=str(year))
+            for year, row in zip(years, values)
+        ],
+    )
+
+    # One color range for every frame, so colors compare across years
+    color_range = (
+        dict(cmin=np.nanmin(values), cmax=np.nanmax(values)) if locations else {}
+    )
+    redraw = {"frame": {"duration": 0, "redraw": True}, "mode": "immediate"}
+    fig.update_layout(
+        title=f"{gas_type} Emissions by Country ({years[0]}–{years[-1]})",
+        coloraxis=dict(
+            colorscale=cmap.lower(), colorbar_title_text="Emissions", **color_range
+        ),
+        margin={"r": 0, "t": 40, "l": 0, "b": 0},
+        sliders=[
+            dict(
+                active=start,
+                currentvalue={"prefix": "Year: "},
+                steps=[
+                    dict(label=str(year), method="animate", args=[[str(year)], redraw])
+                    for year in years
+                ],
+            )
+        ],
+        updatemenus=[
+            dict(
+                type="buttons",
+                showactive=False,
+                x=0,
+                y=0,
+                xanchor="right",
+                yanchor="top",
+                buttons=[
+                    dict(
+                        label="▶",
+                        method="animate",
+                        args=[
+                            None,
+                            {
+                                "frame": {"duration": 400, "redraw": True},
+                                "fromcurrent": True,
+                            },
+                        ],
+                    ),
+                    dict(label="⏸", method="animate", args=[[None], redraw]),
+                ],
+            )
+        ],
+    )
+    fig.update_geos(projection_type="natural earth")
+
+    return fig
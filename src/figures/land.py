@@ -0,0 +1,202 @@
+"""Land use figures: filtered rows of the land dataset in, Plotly figures out"""
+from downsample import downsample_figure
+from figures import fastpx
+from lazy_import import lazy_import
+
+# Imported when the first figure is built
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
+
+def create_stacked_area_chart(df):
+    """Create stacked area chart for land composition over time"""
+    if df.empty:
+        return go.Figure()
+    
+    # Aggregate data by land type and time
+    area_data = df.groupby(['Time', 'Types of Land'])['Actual area (ha)'].sum().reset_index()
+    area_data = area_data.pivot(index='Time', columns='Types of Land', values='Actual area (ha)').fillna(0)
+    
+    fig = go.Figure()
+    
+    # Add area traces for each land type
+    for land_type in area_data.columns:
+        fig.add_trace(go.Scatter(
+            x=area_data.index,
+            y=area_data[land_type],
+            mode='lines',
+            stackgroup='one',
+            name=land_type,
+            line=dict(width=0.5),
+            fillcolor=px.colors.qualitative.Set3[len(fig.data) % len(px.colors.qualitative.Set3)]
+        ))
+    
+    fig.update_layout(
+        title='🌾 Land Use Composition Over Time (Stacked Area)',
+        xaxis_title='Year',
+        yaxis_title='Area (Hectares)',
+        hovermode='x unified',
+        height=500,
+        showlegend=True,
+        font=dict(size=12)
+    )
+    
+    return fig
+
+def create_temporal_trends_chart(df):
+    """Create line chart for temporal trends"""
+    if df.empty:
+        return go.Figure()
+    
+    # Aggregate data by country, land type, and time
+    trend_data = df.groupby(['Country', 'Types of Land', 'Time'])['Actual area (ha)'].sum().reset_index()
+    
+    fig = fastpx.line(
+        trend_data,
+        x='Time',
+        y='Actual area (ha)',
+        color='Types of Land',
+        facet_col='Country',
+        facet_col_wrap=3,
+        title='📈 Land Use Trends by Country and Type',
+        labels={'Actual area (ha)': 'Area (Hectares)', 'Time': 'Year'}
+    )
+    
+    fig.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=5))
+    fig.update_layout(height=600, font=dict(size=10))
+    
+    return downsample_figure(fig, columns=3)
+
+def create_country_comparison_chart(df):
+    """Create bar chart for country comparisons"""
+    if df.empty:
+        return go.Figure()
+    
+    # Get average land area by country and type
+    country_data = df.groupby(['Country', 'Types of Land'])['Actual area (ha)'].mean().reset_index()
+    
+    fig = fastpx.bar(
+        country_data,
+        x='Country',
+        y='Actual area (ha)',
+        color='Types of Land',
+        title='🏆 Average Land Use by Country and Type',
+        labels={'Actual area (ha)': 'Average Area (Hectares)'},
+        barmode='group'
+    )
+    
+    fig.update_layout(
+        height=500,
+        xaxis_tickangle=-45,
+        showlegend=True,
+        font=dict(size=12)
+    )
+    
+    return fig
+
+def create_land_composition_pie_chart(df):
+    """Create pie chart for land type proportions"""
+    if df.empty:
+        return go.Figure()
+    
+    # Aggregate total area by land type
+    pie_data = df.groupby('Types of Land')['Actual area (ha)'].sum().reset_index()
+    pie_data = pie_data[pie_data['Actual area (ha)'] > 0]  # Remove zero values
+    
+    fig = px.pie(
+        pie_data,
+        values='Actual area (ha)',
+        names='Types of Land',
+        title='🥧 Global Land Use Distribution',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=500, font=dict(size=12))
+    
+    return fig
+
+def create_heatmap_chart(df):
+    """Create heatmap for country vs land type analysis"""
+    if df.empty:
+        return go.Figure()
+    
+    # Create pivot table for heatmap
+    heatmap_data = df.groupby(['Country', 'Types of Land'])['Actual area (ha)'].mean().reset_index()
+    heatmap_pivot = heatmap_data.pivot(index='Country', columns='Types of Land', values='Actual area (ha)').fillna(0)
+    
+    # Limit to top 20 countries with most total agricultural land
+    country_totals = heatmap_pivot.sum(axis=1).sort_values(ascending=False).head(20)
+    heatmap_pivot = heatmap_pivot.loc[country_totals.index]
+    
+    fig = px.imshow(
+        heatmap_pivot,
+        title='🔥 Land Use Intensity Heatmap (Country vs Land Type)',
+        labels=dict(x="Land Type", y="Country", color="Area (ha)"),
+        color_continuous_scale='Greens',
+        aspect='auto'
+    )
+    
+    fig.update_layout(height=600, font=dict(size=10))
+    
+    return fig
+
+def create_map_chart(df):
+    """Create world map showing total agricultural land by country"""
+    if df.empty:
+        return go.Figure()
+    
+    # Aggregate total land area by country
+    map_data = df.groupby('Country')['Actual area (ha)'].sum().reset_index()
+    map_data = map_data[map_data['Actual area (ha)'] > 0]
+    
+    # Map country names to ISO codes for better mapping
+    country_mapping = {
+        'United States': 'USA',
+        'United Kingdom': 'GBR',
+        'China (People\'s Republic of)': 'CHN',
+        'Korea': 'KOR',
+        'Türkiye': 'TUR',
+        'European Union (27 countries from 01/02/2020)': None,  # Skip EU aggregate
+        'European Union (28 countries)': None,  # Skip EU aggregate
+    }
+    
+    # Apply country name mapping
+    map_data['Country_Clean'] = map_data['Country'].replace(country_mapping)
+    map_data = map_data[map_data['Country_Clean'].notna()]
+    
+    fig = px.choropleth(
+        map_data,
+        locations='Country_Clean',
+        color='Actual area (ha)',
+        hover_name='Country',
+        color_continuous_scale='Greens',
+        title='🗺️ Global Agricultural Land Distribution',
+        labels={'Actual area (ha)': 'Total Area (Hectares)'}
+    )
+    
+    fig.update_layout(height=500, font=dict(size=12))
+    
+    return fig
+
+def create_top_countries_chart(df):
+    """Create horizontal bar chart of top countries by total agricultural land"""
+    if df.empty:
+        return go.Figure()
+    
+    # Get top 15 countries by total agricultural land
+    top_countries = df.groupby('Country')['Actual area (ha)'].sum().sort_values(ascending=True).tail(15)
+    
+    fig = px.bar(
+        x=top_countries.values,
+        y=top_countries.index,
+        orientation='h',
+        title='🏆 Top 15 Countries by Total Agricultural Land',
+        labels={'x': 'Total Area (Hectares)', 'y': 'Country'},
+        color=top_countries.values,
+        color_continuous_scale='Greens'
+    )
+    
+    fig.update_layout(height=600, font=dict(size=12))
+    
+    return fig
@@ -0,0 +1,185 @@
+"""Nutrient balance figures, built from subsets of the nutrients cube"""
+from downsample import downsample_figure
+from figures import fastpx
+from lazy_import import lazy_import
+
+# Imported when the first figure is built
+px = lazy_import('plotly.express')
+go = lazy_import('plotly.graph_objects')
+
+
+def build_choropleth_map(data):
+    grouped = data.groupby(['REF_AREA'], as_index=False, observed=True)['OBS_VALUE'].sum()
+
+    fig = px.choropleth(
+        grouped,
+        locations='REF_AREA',
+        locationmode='ISO-3',
+        color='OBS_VALUE',
+        color_continuous_scale='sunsetdark',
+        labels={'OBS_VALUE': 'Kilogramme'},
+        title='Choropleth Map of Nutrient Balance per hectare'
+    )
+
+    fig.update_layout(
+        height=800,
+        geo=dict(showframe=False, showcoastlines=False),
+    )
+
+    return fig
+
+
+def build_hori_stacked_plot(data, year_range):
+    grouped = data.groupby(['Reference area', 'Measure'], as_index=False, observed=True)['OBS_VALUE'].sum()
+    total = grouped.groupby('Reference area', as_index=False, observed=True)['OBS_VALUE'].sum()
+    total = total.rename(columns={'OBS_VALUE': 'Total'})
+
+    grouped = grouped.merge(total, on='Reference area')
+
+    grouped['Proportion'] = grouped['OBS_VALUE'] / grouped['Total']
+
+
+    fig = fastpx.bar(
+        grouped,
+        x='Proportion',
+        y='Reference area',
+        color='Measure',
+        orientation='h',
+        hover_data=['OBS_VALUE'],
+        title=f'Organic / Inorganic Fertilisers Proportional Composition in {year_range[0]} - {year_range[1]}',
+        color_discrete_map={
+            'Organic': 'green',
+            'Inorganic': 'gray'
+        }
+    )
+
+    fig.update_layout(
+        barmode='stack',
+        xaxis_tickformat='.0%',
+        margin=dict(l=0, r=0, t=30, b=0),
+        legend=dict(
+            orientation="v", 
+            x=1,              
+            y=-0.5,             
+            xanchor="right",   
+            yanchor="bottom"   
+        )
+    )
+
+    return fig
+
+
+def build_pie_plot(data, live_type, year_range):
+    data = data[data['Nutrients'] == live_type]
+    grouped = data.groupby('Measure', as_index=False, observed=True)['OBS_VALUE'].sum()
+
+    fig = px.pie(grouped, names='Measure', values='OBS_VALUE', hole=0.5)
+    fig.update_layout(
+        title=f"Nutrient Livestock Input contriubtion in {year_range[0]} - {year_range[1]}",
+        margin=dict(l=0, r=0, t=30, b=0),
+        legend=dict(
+            orientation="v",   
+            x=1,               
+            y=0,              
+            xanchor="right",   
+            yanchor="bottom"   
+        ))
+
+    fig.update_traces(
+        domain=dict(x=[0.2, 0.8], y=[0.2, 0.8]),
+        textinfo='percent+label',  # show % and label on chart
+        hovertemplate='%{label}: %{value:,} (%{percent})<extra></extra>',
+    )
+
+    return fig
+
+
+def build_stacked_bar_plot(data, cat_type, year_range):
+    data = data[data['Nutrients'] == cat_type]
+    grouped = data.groupby(['Reference area', 'Measure'], as_index=False, observed=True)['OBS_VALUE'].sum()
+
+    fig = fastpx.bar(
+        grouped,
+        x = 'Reference area',
+        y = 'OBS_VALUE',
+        color = 'Measure',
+        barmode = 'stack',
+        labels={'OBS_VALUE': 'Tonnes'},
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+
+    fig.update_layout(title=f"Nutrient Output contributions across Areas in {year_range[0]} - {year_range[1]}", 
+                      xaxis_title="Area", 
+                      yaxis_title="Tonnes",
+                      margin=dict(l=0, r=0, t=50, b=0))
+
+    return fig
+
+
+def build_line_plot(data, n_meas, n_type, year_range):
+    data = data[data['Nutrients'] == n_type]
+
+    fig = fastpx.line(
+        data,
+        x ='TIME_PERIOD',
+        y ='OBS_VALUE',
+        color = 'Reference area',
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title=f"{n_type} {n_meas} Trend in {year_range[0]} - {year_range[1]}",
+        labels={'OBS_VALUE': 'Tonnes', 'TIME_PERIOD': 'Year', 'area': 'Areas'}
+    )
+
+    fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), legend_title_text='Area')
+    fig.update_traces(mode="lines+markers")
+
+    # The trend chart sits in the right-hand column of the page
+    return downsample_figure(fig, share=0.61)
+
+
+def build_proportion_bar(name, value1, value2):
+    total = value1 + value2
+    # Create the figure
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=["Proportion"],  # y is used because we're rotating it to horizontal
+        x=[value1],
+        name="Nitrogen",
+        orientation='h',
+        marker=dict(color='#A7C1A8'),
+        text=[f"{(value1/total)*100:.1f}%"],
+        textposition='inside'
+    ))
+
+    fig.add_trace(go.Bar(
+        y=["Proportion"],
+        x=[value2],
+        name="Phosphorus",
+        orientation='h',
+        marker=dict(color='#FFF9BD'),
+        text=[f"{(value2/total)*100:.1f}%"],
+        textposition='inside'
+    ))
+
+    # Update layout
+    fig.update_layout(
+        title=dict(
+            text=f"<span style='font-weight:500'>{name}</span>",
+        ),
+        barmode='stack',
+        height=90,
+        showlegend=True,
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False
+        ),
+        yaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            showticklabels=False
+        ),
+    )
+
+    return fig
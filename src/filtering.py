@@ -0,0 +1,127 @@
+"""Row selection helpers shared by the dashboard pages"""
+import numpy as np
+
+
+class InvertedIndex:
+    """Sorted row positions of every value of the indexed columns.
+
+    Multiselect filters become unions and intersections of position arrays,
+    so their cost scales with the number of matching rows rather than with
+    the size of the frame.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.positions = {
+            column: df.groupby(column, observed=True, sort=False).indices
+            for column in columns
+        }
+
+    def __contains__(self, column):
+        return column in self.positions
+
+    def rows(self, column, values):
+        """Sorted positions of the rows whose `column` is any of `values`"""
+        positions = self.positions[column]
+        parts = [positions[value] for value in dict.fromkeys(values) if value in positions]
+        if not parts:
+            return np.array([], dtype=np.intp)
+
+        # Distinct values own disjoint rows, so the union is a plain sort
+        return np.sort(np.concatenate(parts))
+
+    def select(self, isin):
+        """Positions of the rows matching every column -> values filter in
+        `isin`, or None when no filter is given"""
+        result = None
+        for column, values in isin.items():
+            rows = self.rows(column, values)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+
+        return result
+
+
+def _range_keep(df, rows, ranges):
+    """Mask over `rows` keeping those inside every inclusive range"""
+    keep = np.ones(len(rows), dtype=bool)
+    for column, (low, high) in ranges.items():
+        values = df[column].to_numpy()[rows]
+        keep &= (values >= low) & (values <= high)
+
+    return keep
+
+
+class FilterPlan:
+    """Collects the subsets of a frame a page needs, keyed on the values of one
+    column, and builds all of them from that column's inverted index.
+
+    Each subset keeps the row order of the source frame.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.subsets = {}
+
+    def add(self, name, values, filtered=True):
+        """Register subset `name` holding the rows whose column value is in
+        `values`. `filtered` subsets are also restricted to the `selected`
+        rows passed to execute(); the others see every row."""
+        values = [values] if isinstance(values, str) else list(values)
+        self.subsets[name] = (values, filtered)
+        return self
+
+    def execute(self, data, index, ranges=None, selected=None):
+        """Return a dict of subset name to frame.
+
+        `index` is an InvertedIndex of `data` covering the plan's column,
+        `ranges` maps a column to an inclusive (low, high) pair applied to
+        every subset, and `selected` holds sorted row positions (None keeps
+        all rows).
+        """
+        result = {}
+        for name, (values, filtered) in self.subsets.items():
+            rows = index.rows(self.column, values)
+            if ranges:
+                rows = rows[_range_keep(data, rows, ranges)]
+            if filtered and selected is not None:
+                rows = np.intersect1d(rows, selected, assume_unique=True)
+            result[name] = data.iloc[rows]
+
+        return result
+
+
+def filter_rows(df, isin=None, ranges=None, index=None):
+    """Select the rows of `df` matching every predicate without building
+    intermediate frames.
+
+    `isin` maps a column to the values to keep and `ranges` maps a column to
+    an inclusive (low, high) pair; empty values skip the predicate. Columns
+    covered by `index` (an InvertedIndex of `df`) are answered from their row
+    positions, everything else through one combined boolean mask. When no
+    predicate removes a row `df` itself is returned, so the result must be
+    treated as read-only.
+    """
+    isin = {column: values for column, values in (isin or {}).items() if len(values)}
+    ranges = {column: bounds for column, bounds in (ranges or {}).items() if len(bounds)}
+
+    rows = None
+    if index is not None:
+        rows = index.select({column: values for column, values in isin.items() if column in index})
+        isin = {column: values for column, values in isin.items() if column not in index}
+
+    if rows is None:
+        mask = np.ones(len(df), dtype=bool)
+        for column, values in isin.items():
+            mask &= df[column].isin(values).to_numpy()
+        for column, (low, high) in ranges.items():
+            values = df[column].to_numpy()
+            mask &= (values >= low) & (values <= high)
+
+        return df if mask.all() else df[mask]
+
+    keep = _range_keep(df, rows, ranges)
+    for column, values in isin.items():
+        keep &= df[column].iloc[rows].isin(values).to_numpy()
+    rows = rows[keep]
+
+    return df if len(rows) == len(df) else df.iloc[rows]
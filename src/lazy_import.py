@@ -0,0 +1,49 @@
+"""Deferred imports for modules only the chart builders need
+
+`lazy_import('plotly.express')` returns a stand-in that imports the real
+module on first attribute access, so a page script starts, draws its
+title and widgets and loads its data before paying for Plotly. How long
+each deferred import took is kept in `import_times` for the benchmark
+harness.
+"""
+import importlib
+import sys
+import threading
+import time
+import types
+
+# Module name -> seconds its deferred import took in this process
+import_times = {}
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports `name` when an attribute is first read"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        with _lock:
+            if self._module is None:
+                already_loaded = self.__name__ in sys.modules
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                if not already_loaded:
+                    import_times[self.__name__] = time.perf_counter() - start
+                self.__dict__['_module'] = module
+
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """The module `name` if already imported, else a LazyModule for it"""
+    return sys.modules.get(name) or LazyModule(name)
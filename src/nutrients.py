@@ -1,86 +1,207 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 
-FILE_PATH = "./src/dataset/cleaned_data.csv"
+from data_access import csv_path, load_aggregate, load_dataset, load_index, load_year_index
+from figure_cache import build_concurrently, cached_figure
+from figure_emit import plotly_chart
+from figures import nutrients as figures
+from filtering import FilterPlan
+
+FILE_PATH = csv_path('nutrients')
 
 STYLE_PATH = "./src/styles/nutrients.css"
 
-st.set_page_config(
-    page_title="Nutrients Balance Dashboard",
-    page_icon=":seedling:",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
+# Only the columns the dashboard plots are read from the dataset cache
+COLUMNS = ['REF_AREA', 'Reference area', 'Measure', 'Nutrients', 'TIME_PERIOD', 'OBS_VALUE']
+
+NUTRIENT_MEASURES = {
+    'Input': 'Nutrient inputs',
+    'Output': 'Nutrient outputs',
+    'Balance': 'Balance (inputs minus outputs)',
+}
+
+NUTRIENT_OUTPUT_CAT = [
+    "Cereals", "Dried pulses and beans", "Harvested crops", 
+    "Harvested fodder crops", "Industrial crops", "Oil crops",
+    "Other crops", "Forage"
+]
+
+FERTILISER_CAT = ['Organic fertilisers (excluding livestock manure)', 'Inorganic fertilisers']
+
+LIVESTOCK_CAT = ['Cattle', 'Pigs', 'Poultry', 'Sheep and goats', 'Other livestock']
+
+BALANCE_PER_HECTARE = 'Balance per hectare'
+
+# Title of the nitrogen/phosphorus bar drawn for each headline measure
+NITPHOS_TITLES = {
+    'Input': "Nitrogen/Phosphorus in Nutrient Inputs",
+    'Output': "Nitrogen/Phosphorus in Nutrient Outputs",
+    'Balance': "Nitrogen/Phosphorus in Nutrient Balance",
+}
+
+NUTRIENT_TYPES = ['Nitrogen', 'Phosphorus']
+
+# The radio each fragment section owns, by session state key: its label and
+# options. The first option is selected until the user picks another.
+RADIOS = {
+    'n_meas': ("Nutrient Measure:", list(NUTRIENT_MEASURES)),
+    'n_type': ("Nutrient Type:", NUTRIENT_TYPES),
+    'cat_type': ("Output Category Nutrient Type:", NUTRIENT_TYPES),
+    'live_type': ("Livestock Fertilisers Nutrient Type:", NUTRIENT_TYPES),
+}
+
+# Threads building the page's figures ahead of drawing them; below 2 they
+# are built one at a time as the page draws them
+BUILD_THREADS = 4
+
+# Every chart sums OBS_VALUE over these keys, so the page queries a cube of
+# those sums for the measures above instead of the raw rows
+CUBE_KEYS = ['REF_AREA', 'Reference area', 'TIME_PERIOD', 'Measure', 'Nutrients']
+
+CUBE_MEASURES = [
+    *NUTRIENT_MEASURES.values(), *NUTRIENT_OUTPUT_CAT, *FERTILISER_CAT,
+    *LIVESTOCK_CAT, BALANCE_PER_HECTARE
+]
+
+# Every subset render_nutrient_page draws, looked up in the cube's inverted
+# index by measure. The choropleth ignores the area selection.
+PAGE_PLAN = FilterPlan('Measure')
+for key, measure in NUTRIENT_MEASURES.items():
+    PAGE_PLAN.add(key, measure)
+PAGE_PLAN.add('output_cat', NUTRIENT_OUTPUT_CAT)
+PAGE_PLAN.add('fertiliser', FERTILISER_CAT)
+PAGE_PLAN.add('livestock', LIVESTOCK_CAT)
+PAGE_PLAN.add('balance_per_hectare', BALANCE_PER_HECTARE, filtered=False)
+
+def radio(key):
+    label, options = RADIOS[key]
+    return st.radio(key=key, label=label, options=options, horizontal=True)
+
+
+def radio_value(key):
+    """The radio's current choice, or its default before it is first drawn"""
+    return st.session_state.get(key, RADIOS[key][1][0])
+
+
+# Figure builders of figures.nutrients, memoized per session
+build_choropleth_map = cached_figure(figures.build_choropleth_map)
+build_hori_stacked_plot = cached_figure(figures.build_hori_stacked_plot)
+build_pie_plot = cached_figure(figures.build_pie_plot)
+build_stacked_bar_plot = cached_figure(figures.build_stacked_bar_plot)
+build_line_plot = cached_figure(figures.build_line_plot)
+build_proportion_bar = cached_figure(figures.build_proportion_bar)
 
-with open(STYLE_PATH) as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
 class NutrientDashboard:
     def __init__(self):
         self.data = self.load_data()
+        self.cube = self.load_cube()
+        self.cube_index = self.load_cube_index()
+        self.year_index = self.load_year_index()
         self.selected_areas = []
         self.year_range = []
 
-        self.load_data()
-
-        
-
     def load_data(self):
         try:
-            data = pd.read_csv(FILE_PATH)
+            data = load_dataset('nutrients', COLUMNS)
         except FileNotFoundError:
             st.error(f"Data file not found: {FILE_PATH}")
             st.stop()
 
         return data
+
+    def load_cube(self):
+        return load_aggregate('nutrients', CUBE_KEYS, where={'Measure': CUBE_MEASURES})
+
+    def load_cube_index(self):
+        return load_index(
+            'nutrients', ['Reference area', 'Measure'],
+            aggregate_keys=CUBE_KEYS, where={'Measure': CUBE_MEASURES}
+        )
+
+    def load_year_index(self):
+        return load_year_index(
+            'nutrients', ['Reference area', 'Measure', 'Nutrients'],
+            where={'Measure': list(NUTRIENT_MEASURES.values())}
+        )
+
+    def select_data(self):
+        """The cube subset behind every chart and the per-nutrient totals of
+        the headline measures for the current selection"""
+        selected = None
+        if 'All areas' not in self.selected_areas:
+            selected = self.cube_index.rows('Reference area', self.selected_areas)
+
+        subsets = PAGE_PLAN.execute(
+            self.cube, self.cube_index,
+            ranges={'TIME_PERIOD': self.year_range}, selected=selected
+        )
+
+        # Answered from the year index instead of masking the frame
+        areas = None if 'All areas' in self.selected_areas else self.selected_areas
+        totals = {
+            key: self.year_index.range_sum(
+                *self.year_range, {'Reference area': areas, 'Measure': measure}, by='Nutrients'
+            )
+            for key, measure in NUTRIENT_MEASURES.items()
+        }
+
+        return subsets, totals
     
+    def figure_calls(self, subsets, totals):
+        """(builder, args) of every figure on the page by chart, for the
+        subsets and totals of select_data and the radios' current choices.
+        The prebuild and the sections drawing the figures both use it, so
+        they agree on what each chart is built from."""
+        n_meas = radio_value('n_meas')
+        calls = {
+            key: (build_proportion_bar, (NITPHOS_TITLES[key], *self.nitphos(totals[key])))
+            for key in NUTRIENT_MEASURES
+        }
+        calls.update(
+            line=(build_line_plot, (subsets[n_meas], n_meas, radio_value('n_type'), self.year_range)),
+            output_cat=(build_stacked_bar_plot, (subsets['output_cat'], radio_value('cat_type'), self.year_range)),
+            fertiliser=(build_hori_stacked_plot, (subsets['fertiliser'], self.year_range)),
+            livestock=(build_pie_plot, (subsets['livestock'], radio_value('live_type'), self.year_range)),
+            choropleth=(build_choropleth_map, (subsets['balance_per_hectare'],)),
+        )
+        return calls
+
+    def prebuild_figures(self, calls):
+        """Build the figures of figure_calls at once on BUILD_THREADS threads.
+
+        The figures land in the session's figure cache, where the sections
+        below find them as they draw in layout order.
+        """
+        build_concurrently(calls.values(), BUILD_THREADS)
+
     def render_nutrient_page(self):
         st.title(":seedling: OECD's Nutrients balance in Agriculture Dashboard")
         st.write("")
         st.write("")
 
-        filtered_data = self.data[
-            (self.data['TIME_PERIOD'] >= self.year_range[0]) & 
-            (self.data['TIME_PERIOD'] <= self.year_range[1])
-        ]
-
-        if 'All areas' not in self.selected_areas:
-            filtered_data = filtered_data[filtered_data['Reference area'].isin(self.selected_areas)]
+        subsets, totals = self.select_data()
+        calls = self.figure_calls(subsets, totals)
+        self.prebuild_figures(calls)
 
         col1, col2, col3 = st.columns([0.38, 0.01, 0.61], gap="small")
 
         with col1:
             sub_col1, sub_col2, sub_col3 = st.columns(3)
             with sub_col1:
-                n_input = filtered_data[filtered_data['Measure'] == 'Nutrient inputs']
-                n_input = n_input['OBS_VALUE'].sum() 
-                st.metric("Nutrient Input", self.format_number(n_input))
+                st.metric("Nutrient Input", self.format_number(totals['Input'].sum()))
 
             with sub_col2:
-                n_output = filtered_data[filtered_data['Measure'] == 'Nutrient outputs']
-                n_output = n_output['OBS_VALUE'].sum() 
-                st.metric("Nutrient Output", self.format_number(n_output))
+                st.metric("Nutrient Output", self.format_number(totals['Output'].sum()))
             
             with sub_col3:
-                n_balance = filtered_data[filtered_data['Measure'] == 'Balance (inputs minus outputs)']
-                n_balance = n_balance['OBS_VALUE'].sum() 
-                st.metric("Nutrient Balance", self.format_number(n_balance))
+                st.metric("Nutrient Balance", self.format_number(totals['Balance'].sum()))
 
             st.markdown("""
                 <hr style="margin-top: 0.3rem; margin-bottom: 1.4rem; border: none; border-top: 2px solid #ccc;" />
                 """, unsafe_allow_html=True)
 
-            n_input = filtered_data[filtered_data['Measure'] == 'Nutrient inputs']
-            self.render_nitphos("Nitrogen/Phosphorus in Nutrient Inputs", n_input)
-
-            n_output = filtered_data[filtered_data['Measure'] == 'Nutrient outputs']
-            self.render_nitphos("Nitrogen/Phosphorus in Nutrient Outputs", n_output)
-
-            n_balance = filtered_data[filtered_data['Measure'] == 'Balance (inputs minus outputs)']
-            self.render_nitphos("Nitrogen/Phosphorus in Nutrient Balance", n_balance)
+            for key in NUTRIENT_MEASURES:
+                self.draw_figure(calls[key], config={'displayModeBar': False})
         
         with col2:
             st.html(
@@ -97,40 +218,14 @@ class NutrientDashboard:
             )
         
         with col3:
-            st.sidebar.markdown("""
-                    <hr style="margin-top: 0.3rem; margin-bottom: 0.3rem; border: none; border-top: 1px solid #ccc;" />
-                    """, unsafe_allow_html=True)
-            st.sidebar.subheader('Nutrient Trend Filter:')
-            
-            n_meas = st.sidebar.radio(key="n_meas", label="Nutrient Measure:",
-                    options=["Input", "Output", "Balance"])
-            
-            n_type = st.sidebar.radio(key="n_type", label="Nutrient Type:",
-                    options=["Nitrogen", "Phosphorus"])
-
-            self.render_line_plot(n_meas, n_type, filtered_data)
+            self.render_trend_section(subsets, totals)
                 
         
         st.markdown("""
                 <hr style="margin-top: 1rem; margin-bottom: 1rem; border: none; border-top: 2px solid #ccc;" />
                 """, unsafe_allow_html=True)
         
-        st.sidebar.markdown("""
-                    <hr style="margin-top: 0.3rem; margin-bottom: 0.3rem; border: none; border-top: 1px solid #ccc;" />
-                    """, unsafe_allow_html=True)
-        
-        st.sidebar.subheader("Output Category Filter")
-        cat_type = st.sidebar.radio(key="cat_type", label="Nutrient Type:",
-                options=["Nitrogen", "Phosphorus"])
-        
-        nutrient_output_cat = [
-            "Cereals", "Dried pulses and beans", "Harvested crops", 
-            "Harvested fodder crops", "Industrial crops", "Oil crops",
-            "Other crops", "Forage"
-        ]
-
-        filtered_output_cat = filtered_data[filtered_data['Measure'].isin(nutrient_output_cat)]
-        self.render_stacked_bar_plot(filtered_output_cat, cat_type)
+        self.render_output_category_section(subsets, totals)
 
         st.markdown("""
                 <hr style="margin-top: 1rem; margin-bottom: 1.7rem; border: none; border-top: 2px solid #ccc;" />
@@ -139,8 +234,7 @@ class NutrientDashboard:
         col4, col5, col6 = st.columns([0.6, 0.01, 0.39])
 
         with col4:
-            filtered_input_cat = filtered_data[filtered_data['Measure'].isin(['Organic fertilisers (excluding livestock manure)', 'Inorganic fertilisers'])]
-            self.render_hori_stacked_plot(filtered_input_cat)
+            self.draw_figure(calls['fertiliser'])
 
         with col5:
             st.html(
@@ -157,161 +251,43 @@ class NutrientDashboard:
             )
 
         with col6:
-            st.sidebar.markdown("""
-                    <hr style="margin-top: 0.3rem; margin-bottom: 0.3rem; border: none; border-top: 1px solid #ccc;" />
-                    """, unsafe_allow_html=True)
-        
-            st.sidebar.subheader("Livestock Fertilisers Filter")
-            live_type = st.sidebar.radio(key="live_type", label="Nutrient Type:",
-                    options=["Nitrogen", "Phosphorus"])
-            
-            livestock_list = {
-                'Cattle', 'Pigs', 'Poultry', 'Sheep and goats', 'Other livestock'
-            }
-
-            filtered_output_cat = filtered_data[filtered_data['Measure'].isin(livestock_list)]
-            self.render_pie_plot(filtered_output_cat, live_type)
+            self.render_livestock_section(subsets, totals)
         
         st.markdown("""
             <hr style="margin-top: 1rem; margin-bottom: 1.7rem; border: none; border-top: 2px solid #ccc;" />
             """, unsafe_allow_html=True)
         
-        choro_data = self.data[
-            (self.data['TIME_PERIOD'] >= self.year_range[0]) & 
-            (self.data['TIME_PERIOD'] <= self.year_range[1])
-        ]
-        bal_per_hec = choro_data[choro_data['Measure'] == 'Balance per hectare']
-        self.render_choropleth_map(bal_per_hec)
+        self.draw_figure(calls['choropleth'])
         
-    def render_choropleth_map(self, data):
-        grouped = data.groupby(['REF_AREA'], as_index=False)['OBS_VALUE'].sum()
-
-        fig = px.choropleth(
-            grouped,
-            locations='REF_AREA',
-            locationmode='ISO-3',
-            color='OBS_VALUE',
-            color_continuous_scale='sunsetdark',
-            labels={'OBS_VALUE': 'Kilogramme'},
-            title='Choropleth Map of Nutrient Balance per hectare'
-        )
+    # The sections below own a radio each. As fragments, changing that radio
+    # reruns only the section; the main filters still rerun the whole page.
+    # Fragments cannot write to the sidebar, so the radios sit with their chart.
+    @st.fragment
+    def render_trend_section(self, subsets, totals):
+        radio_col1, radio_col2 = st.columns(2)
+        with radio_col1:
+            radio('n_meas')
 
-        fig.update_layout(
-            height=800,
-            geo=dict(showframe=False, showcoastlines=False),
-        )
+        with radio_col2:
+            radio('n_type')
 
-        st.plotly_chart(fig, use_container_width=True)
-            
-        
-    def render_hori_stacked_plot(self, data):
-        grouped = data.groupby(['Reference area', 'Measure'], as_index=False)['OBS_VALUE'].sum()
-        total = grouped.groupby('Reference area', as_index=False)['OBS_VALUE'].sum()
-        total = total.rename(columns={'OBS_VALUE': 'Total'})
+        self.draw_figure(self.figure_calls(subsets, totals)['line'])
 
-        grouped = grouped.merge(total, on='Reference area')
+    @st.fragment
+    def render_output_category_section(self, subsets, totals):
+        radio('cat_type')
 
-        grouped['Proportion'] = grouped['OBS_VALUE'] / grouped['Total']
-        
+        self.draw_figure(self.figure_calls(subsets, totals)['output_cat'])
 
-        fig = px.bar(
-            grouped,
-            x='Proportion',
-            y='Reference area',
-            color='Measure',
-            orientation='h',
-            hover_data=['OBS_VALUE'],
-            title=f'Organic / Inorganic Fertilisers Proportional Composition in {self.year_range[0]} - {self.year_range[1]}',
-            color_discrete_map={
-                'Organic': 'green',
-                'Inorganic': 'gray'
-            }
-        )
+    @st.fragment
+    def render_livestock_section(self, subsets, totals):
+        radio('live_type')
 
-        fig.update_layout(
-            barmode='stack',
-            xaxis_tickformat='.0%',
-            margin=dict(l=0, r=0, t=30, b=0),
-            legend=dict(
-                orientation="v", 
-                x=1,              
-                y=-0.5,             
-                xanchor="right",   
-                yanchor="bottom"   
-            )
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-    def render_pie_plot(self, data, live_type):
-        data = data[data['Nutrients'] == live_type]
-        grouped = data.groupby('Measure', as_index=False)['OBS_VALUE'].sum()
-
-        fig = px.pie(grouped, names='Measure', values='OBS_VALUE', hole=0.5)
-        fig.update_layout(
-            title=f"Nutrient Livestock Input contriubtion in {self.year_range[0]} - {self.year_range[1]}",
-            margin=dict(l=0, r=0, t=30, b=0),
-            legend=dict(
-                orientation="v",   
-                x=1,               
-                y=0,              
-                xanchor="right",   
-                yanchor="bottom"   
-            ))
-
-        fig.update_traces(
-            domain=dict(x=[0.2, 0.8], y=[0.2, 0.8]),
-            textinfo='percent+label',  # show % and label on chart
-            hovertemplate='%{label}: %{value:,} (%{percent})<extra></extra>',
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-    def render_stacked_bar_plot(self, data, cat_type):
-        data = data[data['Nutrients'] == cat_type]
-        grouped = data.groupby(['Reference area', 'Measure'], as_index=False)['OBS_VALUE'].sum()
-
-        fig = px.bar(
-            grouped,
-            x = 'Reference area',
-            y = 'OBS_VALUE',
-            color = 'Measure',
-            barmode = 'stack',
-            labels={'OBS_VALUE': 'Tonnes'},
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-        )
-
-        fig.update_layout(title=f"Nutrient Output contributions across Areas in {self.year_range[0]} - {self.year_range[1]}", 
-                          xaxis_title="Area", 
-                          yaxis_title="Tonnes",
-                          margin=dict(l=0, r=0, t=50, b=0))
-        
-        st.plotly_chart(fig, use_container_width=True)
-
-    def render_line_plot(self, n_meas, n_type, data):
-        if n_meas == 'Input':
-            data = data[data['Measure'] == 'Nutrient inputs']
-        elif n_meas == 'Output':
-            data = data[data['Measure'] == 'Nutrient outputs']
-        elif n_meas == 'Balance':
-            data = data[data['Measure'] == 'Balance (inputs minus outputs)']
-
-        data = data[data['Nutrients'] == n_type]
-
-        fig = px.line(
-            data,
-            x ='TIME_PERIOD',
-            y ='OBS_VALUE',
-            color = 'Reference area',
-            color_discrete_sequence=px.colors.qualitative.Pastel,
-            title=f"{n_type} {n_meas} Trend in {self.year_range[0]} - {self.year_range[1]}",
-            labels={'OBS_VALUE': 'Tonnes', 'TIME_PERIOD': 'Year', 'area': 'Areas'}
-        )
-
-        fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), legend_title_text='Area')
-        fig.update_traces(mode="lines+markers")
+        self.draw_figure(self.figure_calls(subsets, totals)['livestock'])
 
-        st.plotly_chart(fig, use_container_width=True)
+    def draw_figure(self, call, **kwargs):
+        builder, args = call
+        plotly_chart(builder(*args), use_container_width=True, **kwargs)
 
     def format_number(self, num):
         if num >= 1_000_000_000:
@@ -323,64 +299,8 @@ class NutrientDashboard:
         else:
             return str(num)
 
-    def render_nitphos(self, name, data):
-        nit_in = data[data['Nutrients'] == 'Nitrogen']
-        phos_in = data[data['Nutrients'] == 'Phosphorus']
-        nit_in = nit_in['OBS_VALUE'].sum() 
-        phos_in = phos_in['OBS_VALUE'].sum()
-
-        self.draw_proportion_bar(name, nit_in, phos_in)
-
-    def draw_proportion_bar(self, name, value1, value2):
-        total = value1 + value2
-        # Create the figure
-        fig = go.Figure()
-
-        fig.add_trace(go.Bar(
-            y=["Proportion"],  # y is used because we're rotating it to horizontal
-            x=[value1],
-            name="Nitrogen",
-            orientation='h',
-            marker=dict(color='#A7C1A8'),
-            text=[f"{(value1/total)*100:.1f}%"],
-            textposition='inside'
-        ))
-
-        fig.add_trace(go.Bar(
-            y=["Proportion"],
-            x=[value2],
-            name="Phosphorus",
-            orientation='h',
-            marker=dict(color='#FFF9BD'),
-            text=[f"{(value2/total)*100:.1f}%"],
-            textposition='inside'
-        ))
-
-        # Update layout
-        fig.update_layout(
-            title=dict(
-                text=f"<span style='font-weight:500'>{name}</span>",
-            ),
-            barmode='stack',
-            height=90,
-            showlegend=True,
-            margin=dict(l=20, r=20, t=20, b=20),
-            xaxis=dict(
-                showgrid=False,
-                zeroline=False,
-                showticklabels=False
-            ),
-            yaxis=dict(
-                showgrid=False,
-                zeroline=False,
-                showticklabels=False
-            ),
-        )
-
-        # Display in Streamlit
-        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-            
+    def nitphos(self, totals):
+        return totals.reindex(NUTRIENT_TYPES, fill_value=0.0).to_numpy()
 
     def run(self):
         with st.sidebar:
@@ -404,7 +324,20 @@ class NutrientDashboard:
 
 
 
+def configure_page():
+    st.set_page_config(
+        page_title="Nutrients Balance Dashboard",
+        page_icon=":seedling:",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+
+    with open(STYLE_PATH) as f:
+        st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+
+
 def main():
+    configure_page()
     dashboard = NutrientDashboard()
     dashboard.run()
 
@@ -0,0 +1,47 @@
+"""The sidebar filters of the land and erosion pages, without Streamlit
+
+The pages and the headless chart exporter both select rows through these,
+so an exported view holds the same rows the page would draw for it. Like
+filter_rows, they return the loaded frame itself when no row is filtered
+out, so callers must not modify the result.
+"""
+from data_access import load_index
+from filtering import filter_rows
+
+# Columns answered from the inverted index by the filter functions
+LAND_FILTER_COLUMNS = ['Country', 'Types of Land']
+EROSION_FILTER_COLUMNS = ['Country', 'Types of Erosion', 'EROSION_LEVEL']
+
+
+def load_land_index():
+    """Row positions of every value of the land page's multiselect columns"""
+    return load_index('land', LAND_FILTER_COLUMNS)
+
+
+def load_erosion_index():
+    """Row positions of every value of the erosion page's multiselect columns"""
+    return load_index('erosion', EROSION_FILTER_COLUMNS)
+
+
+def filter_land(df, countries, years, land_types, index=None):
+    """Rows of the land dataset matching the page's filters; may be `df`"""
+    return filter_rows(
+        df,
+        isin={'Country': countries, 'Types of Land': land_types},
+        ranges={'Time': years},
+        index=index,
+    )
+
+
+def filter_erosion(df, countries, years, erosion_types, severity_levels, index=None):
+    """Rows of the erosion dataset matching the page's filters; may be `df`"""
+    return filter_rows(
+        df,
+        isin={
+            'Country': countries,
+            'Types of Erosion': erosion_types,
+            'EROSION_LEVEL': severity_levels,
+        },
+        ranges={'Time': years},
+        index=index,
+    )
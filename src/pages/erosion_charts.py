@@ -1,62 +1,62 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
 
-# Page configuration
-st.set_page_config(
-    page_title="🌍 Global Erosion Analysis Dashboard",
-    page_icon="🌍",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from data_access import load_dataset
+from figure_cache import cached_figure
+from figure_emit import plotly_chart
+from figures import erosion as figures
+from page_filters import filter_erosion, load_erosion_index
 
-# Force light theme
-st.markdown("""
-<style>
-    .stApp {
-        background-color: white;
-        color: black;
-    }
-    .stSidebar {
-        background-color: #f8f9fa;
-    }
-</style>
-""", unsafe_allow_html=True)
+def configure_page():
+    """Page configuration and custom CSS"""
+    # Page configuration
+    st.set_page_config(
+        page_title="🌍 Global Erosion Analysis Dashboard",
+        page_icon="🌍",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
-# Custom CSS for better styling
-st.markdown("""
-<style>
-    .main > div {
-        padding-top: 2rem;
-    }
-    .stMetric {
-        background-color: #f0f2f6;
-        border: 1px solid #e1e5e9;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .education-box {
-        background-color: #e8f4fd;
-        border-left: 4px solid #1f77b4;
-        padding: 1rem;
-        margin: 1rem 0;
-        border-radius: 0.25rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+    # Force light theme
+    st.markdown("""
+    <style>
+        .stApp {
+            background-color: white;
+            color: black;
+        }
+        .stSidebar {
+            background-color: #f8f9fa;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    # Custom CSS for better styling
+    st.markdown("""
+    <style>
+        .main > div {
+            padding-top: 2rem;
+        }
+        .stMetric {
+            background-color: #f0f2f6;
+            border: 1px solid #e1e5e9;
+            padding: 1rem;
+            border-radius: 0.5rem;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .education-box {
+            background-color: #e8f4fd;
+            border-left: 4px solid #1f77b4;
+            padding: 1rem;
+            margin: 1rem 0;
+            border-radius: 0.25rem;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
-@st.cache_data
 def load_data():
     """Load and preprocess erosion data"""
     try:
-        df = pd.read_csv('./src/dataset/erosion_data.csv')
-        df['Time'] = pd.to_numeric(df['Time'], errors='coerce')
-        df['OBS_VALUE'] = pd.to_numeric(df['OBS_VALUE'], errors='coerce')
-        return df
+        return load_dataset('erosion')
     except FileNotFoundError:
         st.error("❌ Data file not found. Please ensure 'dataset/erosion_data.csv' exists.")
         return pd.DataFrame()
@@ -70,110 +70,14 @@ def create_educational_note(title, content):
     </div>
     """, unsafe_allow_html=True)
 
-def filter_data(df, countries, years, erosion_types, severity_levels):
-    """Apply filters to the dataset"""
-    filtered_df = df.copy()
-    
-    if countries:
-        filtered_df = filtered_df[filtered_df['Country'].isin(countries)]
-    if years:
-        filtered_df = filtered_df[(filtered_df['Time'] >= years[0]) & (filtered_df['Time'] <= years[1])]
-    if erosion_types:
-        filtered_df = filtered_df[filtered_df['Types of Erosion'].isin(erosion_types)]
-    if severity_levels:
-        filtered_df = filtered_df[filtered_df['EROSION_LEVEL'].isin(severity_levels)]
-    
-    return filtered_df
-
-def create_time_series_chart(df):
-    """Create interactive time series chart"""
-    if df.empty:
-        return go.Figure()
-    
-    # Aggregate data for total erosion by country and year
-    total_data = df[df['EROSION_LEVEL'] == '_T'].groupby(['Country', 'Time', 'Types of Erosion'])['OBS_VALUE'].sum().reset_index()
-    
-    fig = px.line(
-        total_data, 
-        x='Time', 
-        y='OBS_VALUE',
-        color='Country',
-        facet_col='Types of Erosion',
-        title='📈 Erosion Trends Over Time (Total Erosion %)',
-        labels={'OBS_VALUE': 'Percentage of Agricultural Land (%)', 'Time': 'Year'}
-    )
-    
-    fig.update_traces(mode='lines+markers', line=dict(width=3), marker=dict(size=6))
-    fig.update_layout(
-        height=500,
-        showlegend=True,
-        hovermode='x unified',
-        font=dict(size=12)
-    )
-    
-    return fig
-
-def create_erosion_comparison_chart(df):
-    """Create wind vs water erosion comparison"""
-    if df.empty:
-        return go.Figure()
-    
-    # Get total erosion data
-    total_data = df[df['EROSION_LEVEL'] == '_T'].groupby(['Country', 'Types of Erosion'])['OBS_VALUE'].mean().reset_index()
-    
-    fig = px.bar(
-        total_data,
-        x='Country',
-        y='OBS_VALUE',
-        color='Types of Erosion',
-        title='🌪️ Wind vs Water Erosion Comparison (Average %)',
-        labels={'OBS_VALUE': 'Average Percentage of Agricultural Land (%)'},
-        barmode='group'
-    )
-    
-    fig.update_layout(
-        height=500,
-        xaxis_tickangle=-45,
-        showlegend=True,
-        font=dict(size=12)
-    )
-    
-    return fig
-
-def create_severity_breakdown_chart(df):
-    """Create severity level breakdown chart"""
-    if df.empty:
-        return go.Figure()
-    
-    # Filter out total values and aggregate by severity
-    severity_data = df[~df['EROSION_LEVEL'].isin(['_T', 'TOL'])].groupby(['EROSION_LEVEL', 'Erosion risk level'])['OBS_VALUE'].mean().reset_index()
-    
-    # Create a mapping for better labels
-    severity_mapping = {
-        'LW': 'Low',
-        'MD': 'Moderate', 
-        'HG': 'High',
-        'SV': 'Severe'
-    }
-    
-    severity_data['Severity_Label'] = severity_data['EROSION_LEVEL'].map(severity_mapping)
-    
-    fig = px.pie(
-        severity_data,
-        values='OBS_VALUE',
-        names='Severity_Label',
-        title='🎯 Global Erosion Severity Distribution',
-        color_discrete_sequence=px.colors.sequential.Reds_r
-    )
-    
-    fig.update_traces(textposition='inside', textinfo='percent+label')
-    fig.update_layout(height=500, font=dict(size=12))
-    
-    return fig
-
+# Figure builders of figures.erosion, memoized per session
+create_time_series_chart = cached_figure(figures.create_time_series_chart)
+create_erosion_comparison_chart = cached_figure(figures.create_erosion_comparison_chart)
+create_severity_breakdown_chart = cached_figure(figures.create_severity_breakdown_chart)
 
 # Main application
 def main():
+    configure_page()
     st.title("🌍 Global Erosion Analysis Dashboard")
     st.markdown("### *Understanding Water and Wind Erosion Patterns Across Countries and Time*")
     
@@ -228,7 +132,7 @@ def main():
     )
     
     # Apply filters
-    filtered_df = filter_data(df, selected_countries, selected_years, selected_erosion_types, selected_severity)
+    filtered_df = filter_erosion(df, selected_countries, selected_years, selected_erosion_types, selected_severity, load_erosion_index())
     
     # Summary metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -257,7 +161,7 @@ def main():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.plotly_chart(create_time_series_chart(filtered_df), use_container_width=True)
+        plotly_chart(create_time_series_chart(filtered_df), use_container_width=True)
     
     with col2:
         create_educational_note(
@@ -270,7 +174,7 @@ def main():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.plotly_chart(create_erosion_comparison_chart(filtered_df), use_container_width=True)
+        plotly_chart(create_erosion_comparison_chart(filtered_df), use_container_width=True)
     
     with col2:
         create_educational_note(
@@ -283,7 +187,7 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        st.plotly_chart(create_severity_breakdown_chart(filtered_df), use_container_width=True)
+        plotly_chart(create_severity_breakdown_chart(filtered_df), use_container_width=True)
 
     with col2:
         create_educational_note(
@@ -1,12 +1,33 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import numpy as np
-
-df_ghg = pd.read_csv("./src/dataset/greenhouse.csv")
 import streamlit.components.v1 as components
-
+from collections import namedtuple
+
+from data_access import dataset_version, load_dataset
+from figure_cache import cached_figure
+from figure_emit import plotly_chart
+from figures import greenhouse as figures
+
+GHG_COLUMNS = [
+    "MEASURE",
+    "Reference area",
+    "TIME_PERIOD",
+    "OBS_VALUE",
+    "MEASURE_CATEGORY",
+    "IS_AGGREGATE_REGION",
+]
+
+TABS = ["📈 KPI", "📊 Pie Chart", "🌀 Heatmap"]
+
+# Keys of the widgets inside each tab
+TAB_WIDGET_KEYS = {
+    "📈 KPI": ["combo_measures", "combo_time", "combo_region"],
+    "📊 Pie Chart": ["pie_time", "pie_region", "pie_category"],
+    "🌀 Heatmap": ["map_cmap", "map_year", "map_measure", "map_animate"],
+}
+
+GreenhouseData = namedtuple(
+    "GreenhouseData", ["data", "measures", "regions", "years", "choropleth"]
+)
 
 # Configure page
 st.set_page_config(layout="wide", initial_sidebar_state="collapsed")
@@ -48,28 +69,47 @@ st.markdown(
 )
 st.divider()
 
-# Sample data
-np.random.seed(42)
-df = pd.DataFrame(
-    {"Category": ["A", "B", "C", "D"], "Values": np.random.randint(10, 100, size=4)}
-)
-df_line = pd.DataFrame(np.random.randn(20, 3), columns=["A", "B", "C"])
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_greenhouse(version):
+    """Typed greenhouse data plus the filter option lists, shared read-only by
+    every session. `version` changes when the CSV does."""
+    data = load_dataset("greenhouse", GHG_COLUMNS)
+    years = data["TIME_PERIOD"].dropna().astype(int).unique()
+
+    measures = tuple(sorted(data["MEASURE"].dropna().unique()))
+    years = tuple(sorted(years.tolist()))
+
+    return GreenhouseData(
+        data=data,
+        measures=measures,
+        regions=tuple(sorted(data["Reference area"].dropna().astype(str).unique())),
+        years=years,
+        choropleth=figures.choropleth_cube(data, years, measures),
+    )
+
+
+# Figure builders of figures.greenhouse, memoized per session
+emissions_line_figure = cached_figure(figures.emissions_line_figure)
+emission_pie_figure = cached_figure(figures.emission_pie_figure)
+emissions_choropleth_figure = cached_figure(figures.emissions_choropleth_figure)
+emissions_choropleth_animation = cached_figure(figures.emissions_choropleth_animation)
 
 
 # -- COMPONENTS using Plotly --
-def kpi_and_line_tab():
+def kpi_and_line_tab(ghg):
+    df_ghg = ghg.data
     st.title("📊 Emission Insights Dashboard")
 
     # === Shared Filters ===
-    measures = sorted(df_ghg["MEASURE"].dropna().unique())
+    measures = list(ghg.measures)
     selected_measures = st.multiselect(
         "Select GHG Measures", measures, default=measures, key="combo_measures"
     )
 
     col_filters, col_chart = st.columns([1, 3])
     with col_filters:
-        min_year = int(df_ghg["TIME_PERIOD"].min())
-        max_year = int(df_ghg["TIME_PERIOD"].max())
+        min_year, max_year = ghg.years[0], ghg.years[-1]
         selected_range = st.slider(
             "Select Time Range",
             min_value=min_year,
@@ -78,7 +118,7 @@ def kpi_and_line_tab():
             key="combo_time",
         )
 
-        all_regions = sorted(df_ghg["Reference area"].dropna().unique())
+        all_regions = list(ghg.regions)
         selected_region = st.selectbox("Select Region", all_regions, key="combo_region")
 
     # === Filtered Data ===
@@ -117,28 +157,19 @@ def kpi_and_line_tab():
 
     # === Line Plot ===
     st.subheader("📉 Emissions Over Time")
-    df_plot = (
-        df_filtered.groupby(["TIME_PERIOD", "MEASURE"])["OBS_VALUE"]
-        .sum()
-        .reset_index()
-        .pivot(index="TIME_PERIOD", columns="MEASURE", values="OBS_VALUE")
-    )
+    df_plot = figures.emissions_over_time(df_filtered)
 
-    fig = px.line(
-        df_plot,
-        title=f"Greenhouse Gas Measures in {selected_region} Over Time",
-        labels={"value": "Emissions", "TIME_PERIOD": "Year"},
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    fig = emissions_line_figure(df_plot, selected_region)
+    plotly_chart(fig, use_container_width=True)
 
 
-def pie_chart_tab():
+def pie_chart_tab(ghg):
+    df_ghg = ghg.data
     col_chart, col_filters = st.columns([2, 1])
 
     with col_filters:
         # Time range filter
-        time_min = int(df_ghg["TIME_PERIOD"].min())
-        time_max = int(df_ghg["TIME_PERIOD"].max())
+        time_min, time_max = ghg.years[0], ghg.years[-1]
         time_range = st.slider(
             "Select Time Range",
             min_value=time_min,
@@ -147,8 +178,8 @@ def pie_chart_tab():
             key="pie_time",
         )
 
-        # Region filter (fix TypeError by converting to string and dropping NaNs)
-        regions = sorted(df_ghg["Reference area"].dropna().astype(str).unique())
+        # Region filter
+        regions = list(ghg.regions)
         selected_region = st.selectbox("Select Region", regions, key="pie_region")
 
         # Measure type filter
@@ -158,116 +189,97 @@ def pie_chart_tab():
 
     # === Filter Data ===
     df_filtered = df_ghg[
-        (df_ghg["Reference area"].astype(str) == selected_region)
+        (df_ghg["Reference area"] == selected_region)
         & (df_ghg["TIME_PERIOD"] >= time_range[0])
         & (df_ghg["TIME_PERIOD"] <= time_range[1])
     ]
 
-    # Remove TOTGHG measures
-    df_filtered = df_filtered[~df_filtered["MEASURE"].str.contains("TOTGHG", na=False)]
-
-    # Apply category filter
-    if category_filter == "TOTAL":
-        df_filtered = df_filtered[
-            ~df_filtered["MEASURE"].str.contains("LULUCF|AGR", na=False)
-        ]
-    elif category_filter == "LULUCF":
-        df_filtered = df_filtered[
-            df_filtered["MEASURE"].str.contains("LULUCF", na=False)
-        ]
-    elif category_filter == "AGR":
-        df_filtered = df_filtered[df_filtered["MEASURE"].str.contains("AGR", na=False)]
+    # Apply category filter; TOTGHG measures fall in none of the choices
+    df_filtered = df_filtered[df_filtered["MEASURE_CATEGORY"] == category_filter]
 
     if df_filtered.empty:
         col_chart.warning("No data available for selected filters.")
         return
 
-    df_grouped = df_filtered.groupby("MEASURE")["OBS_VALUE"].sum().reset_index()
-
-    # No explode effect by default
-    fig = go.Figure(
-        go.Pie(
-            labels=df_grouped["MEASURE"],
-            values=df_grouped["OBS_VALUE"],
-            hoverinfo="label+percent+value",
-            textinfo="label+percent",
-            hole=0,
-            pull=[0] * len(df_grouped),  # no explode
-        )
-    )
+    df_grouped = figures.emissions_by_measure(df_filtered)
 
-    fig.update_layout(
-        title=f"Emission Distribution in {selected_region} ({time_range[0]}–{time_range[1]}) – {category_filter}"
-    )
+    fig = emission_pie_figure(df_grouped, selected_region, time_range, category_filter)
 
     with col_chart:
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
 
-def choropleth_tab():
+def choropleth_tab(ghg):
+    cube = ghg.choropleth
     col1, col2 = st.columns([1, 3])
 
     with col1:
-        # Clean TIME_PERIOD column: drop NaN or inf
-        df_years = df_ghg[
-            pd.to_numeric(df_ghg["TIME_PERIOD"], errors="coerce").notnull()
-        ].copy()
-        df_years["TIME_PERIOD"] = df_years["TIME_PERIOD"].astype(int)
-
         # Colormap selector
         cmap = st.selectbox(
-            "Color map", ["Viridis", "Cividis", "Plasma", "Inferno"], index=0
+            "Color map",
+            ["Viridis", "Cividis", "Plasma", "Inferno"],
+            index=0,
+            key="map_cmap",
         )
 
         # Year selector
-        years = sorted(df_years["TIME_PERIOD"].unique())
-        selected_year = st.selectbox("Select Year", years, index=len(years) - 1)
+        years = list(ghg.years)
+        selected_year = st.selectbox(
+            "Select Year", years, index=len(years) - 1, key="map_year"
+        )
 
         # Measure filter
-        available_measures = sorted(df_ghg["MEASURE"].dropna().unique())
-        gas_type = st.selectbox("Select Emission Measure", available_measures)
-
-    with col2:
-        # Filter and aggregate data
-        df_filtered = df_ghg[
-            (df_ghg["TIME_PERIOD"] == selected_year)
-            & (df_ghg["MEASURE"] == gas_type)
-            & (
-                ~df_ghg["Reference area"]
-                .astype(str)
-                .str.contains("World|EU|Total", na=False)
-            )
-        ]
-
-        df_grouped = (
-            df_filtered.groupby("Reference area")["OBS_VALUE"].sum().reset_index()
+        available_measures = list(ghg.measures)
+        gas_type = st.selectbox(
+            "Select Emission Measure", available_measures, key="map_measure"
         )
 
-        # Create choropleth map
-        fig = px.choropleth(
-            df_grouped,
-            locations="Reference area",
-            locationmode="country names",
-            color="OBS_VALUE",
-            color_continuous_scale=cmap.lower(),
-            labels={"OBS_VALUE": "Emissions"},
-            title=f"{gas_type} Emissions by Country ({selected_year})",
+        animate = st.toggle(
+            "Animate over years",
+            key="map_animate",
+            help="Send every year at once and scrub through them in the browser",
         )
 
-        fig.update_geos(projection_type="natural earth")
-        fig.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0})
+    with col2:
+        # Emissions of every country for the measure, one row per year
+        values = cube.values[:, cube.measures.index(gas_type)]
+        if animate:
+            fig = emissions_choropleth_animation(
+                cube.countries, values, cube.years, gas_type, selected_year, cmap
+            )
+        else:
+            countries, row = figures.choropleth_year(cube, gas_type, selected_year)
+            fig = emissions_choropleth_figure(
+                countries, row, gas_type, selected_year, cmap
+            )
 
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
 
 
 # Tabs
-tabs = st.tabs(["📈 KPI", "📊 Pie Chart", "🌀 Heatmap"])
+ghg = load_greenhouse(dataset_version("greenhouse"))
+
+# Streamlit drops the value of a widget that is not rendered in a run, as the
+# widgets of closed tabs are not. Writing their values back keeps every tab's
+# selections across tab switches.
+open_tab = st.session_state.get("ghg_tab", TABS[0])
+for tab, keys in TAB_WIDGET_KEYS.items():
+    for key in keys:
+        if tab != open_tab and key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+# Only the open tab runs; switching tabs reruns the page, and figures built
+# for a tab earlier in the session come back from the figure cache
+tabs = st.tabs(TABS, key="ghg_tab", on_change="rerun")
 with tabs[0]:
-    kpi_and_line_tab()
+    if tabs[0].open:
+        kpi_and_line_tab(ghg)
 with tabs[1]:
-    pie_chart_tab()
+    if tabs[1].open:
+        pie_chart_tab(ghg)
 with tabs[2]:
-    choropleth_tab()
+    if tabs[2].open:
+        choropleth_tab(ghg)
 
 st.html("<h3>Greenhouse Gas Emissions vs Economic Activity</h3>")
 
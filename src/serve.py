@@ -0,0 +1,166 @@
+"""Pre-forking launcher for running several dashboard servers on one host
+
+    python src/serve.py --workers 4 --port 8501
+
+The parent process imports pandas, Plotly and Streamlit, builds any stale
+column stores and loads every dataset once, then forks one Streamlit server
+per worker on consecutive ports for the load balancer to spread sessions
+over. Workers inherit the imported modules and loaded frames, so they
+start warm: the frames' arrays are mapped from the column store and shared
+through the page cache, and everything else the parent built is shared
+copy-on-write until a worker writes to it.
+
+A worker that exits is restarted; SIGINT or SIGTERM stops them all. Run it
+from the repository root, like `streamlit run src/nutrients.py`. Needs
+os.fork, so POSIX only.
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import sys
+import time
+import traceback
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nutrients.py')
+
+# Modules every page imports; importing them in the parent spares each
+# worker the cost
+PRELOAD_MODULES = [
+    'numpy',
+    'pandas',
+    'plotly.express',
+    'plotly.graph_objects',
+    'streamlit',
+    'streamlit.web.bootstrap',
+    'data_access',
+    'downsample',
+    'figure_cache',
+    'figure_emit',
+    'figures.erosion',
+    'figures.greenhouse',
+    'figures.land',
+    'figures.nutrients',
+    'filtering',
+    'page_filters',
+    'year_index',
+]
+
+# Seconds to wait before restarting a worker that exited, so one that
+# cannot start does not spin
+RESTART_DELAY = 1
+
+
+def preload():
+    """Import the shared modules and load every dataset into this process"""
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+    from data_access import DATASETS, load_dataset
+    for name in DATASETS:
+        load_dataset(name)
+
+    # Plotly imports the classes behind each trace type on first use
+    import plotly.graph_objects as go
+    for trace in (go.Scatter, go.Scattergl, go.Bar, go.Pie, go.Choropleth):
+        go.Figure(trace()).to_json()
+
+
+def run_worker(port, address):
+    """Serve the dashboard on `port`; returns when the server stops"""
+    from streamlit.web import bootstrap
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    flag_options = {
+        'server_port': port,
+        'server_address': address,
+        'server_headless': True,
+    }
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(MAIN_SCRIPT, False, [], flag_options)
+
+
+class Supervisor:
+    """Forks the workers and restarts any that exit until stopped"""
+
+    def __init__(self, ports, address):
+        self.ports = ports
+        self.address = address
+        self.workers = {}
+        self.stopping = False
+
+    def spawn(self, port):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(port, self.address)
+            except BaseException:
+                # os._exit skips the interpreter's own report, so print the
+                # traceback here or the failure never reaches the log
+                traceback.print_exc()
+                sys.stderr.flush()
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.workers[pid] = port
+        print(f"worker {pid} serving on port {port}", file=sys.stderr)
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        for port in self.ports:
+            self.spawn(port)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            port = self.workers.pop(pid, None)
+            if port is None or self.stopping:
+                continue
+
+            print(f"worker {pid} on port {port} exited with status {status}, restarting", file=sys.stderr)
+            time.sleep(RESTART_DELAY)
+            if not self.stopping:
+                self.spawn(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="number of servers to fork")
+    parser.add_argument('--port', type=int, default=8501, help="port of the first server; the others follow it")
+    parser.add_argument('--address', default='0.0.0.0', help="address the servers listen on")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, 'fork'):
+        parser.error("forking workers needs a POSIX system")
+
+    start = time.perf_counter()
+    preload()
+    print(f"preloaded data and modules in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    # Keep the preloaded objects out of the garbage collector's reach, so
+    # its passes do not write to, and so unshare, their memory pages
+    gc.freeze()
+
+    Supervisor([args.port + i for i in range(args.workers)], args.address).run()
+
+
+if __name__ == '__main__':
+    main()
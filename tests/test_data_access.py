@@ -0,0 +1,125 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_access
+
+
+@pytest.fixture
+def sample(tmp_path, monkeypatch):
+    """Register a dataset backed by a CSV written to tmp_path, with its
+    column store under tmp_path too"""
+    def register(text, **spec):
+        (tmp_path / 'sample.csv').write_text(text)
+        monkeypatch.setattr(data_access, 'DATASET_DIR', str(tmp_path))
+        monkeypatch.setattr(data_access, 'CACHE_DIR', str(tmp_path / '.cache'))
+        data_access._load_dataset.cache_clear()
+        monkeypatch.setitem(data_access.DATASETS, 'sample', {'file': 'sample.csv', **spec})
+        return str(tmp_path / 'sample.csv')
+
+    return register
+
+
+def decoded(chunk_rows):
+    df, text_dtypes = data_access.read_csv_chunked('sample', chunk_rows)
+    return df.astype(text_dtypes)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 3, 10])
+def test_chunked_matches_whole_file(sample, chunk_rows):
+    path = sample(
+        "Country,Note,Time,OBS_VALUE\nA,,2000,1.5\nB,,2001,x\nC,n,2002,3\nD,,2003,4\n",
+        numeric=['Time', 'OBS_VALUE'],
+    )
+    expected = pd.read_csv(path)
+    expected['OBS_VALUE'] = pd.to_numeric(expected['OBS_VALUE'], errors='coerce')
+
+    pd.testing.assert_frame_equal(decoded(chunk_rows), expected)
+
+
+def test_text_column_blank_for_whole_first_chunk(sample):
+    path = sample(
+        "Country,Note,Time\nA,,2000\nB,,2001\nC,x,2002\nD,y,2003\n",
+        numeric=['Time'],
+    )
+
+    pd.testing.assert_frame_equal(decoded(2), pd.read_csv(path))
+
+
+def test_prepare_filters_each_chunk(sample):
+    sample(
+        "Country,Types of Land,Time\nA,Forest,2000\nB,HA,2001\nC,Types of Land,Time\nD,,2003\nE,Crop,2004\n",
+        numeric=['Time'], prepare=data_access._prepare_land,
+    )
+
+    df = decoded(2)
+    assert list(df.index) == [0, 4]
+    assert list(df['Types of Land']) == ['Forest', 'Crop']
+    assert df['Time'].tolist() == [2000, 2004]
+
+
+def test_blank_column_round_trip(sample):
+    path = sample("Country,Note,Time,OBS_VALUE\nA,,2000,1\nB,,2001,2\n", numeric=['Time', 'OBS_VALUE'])
+    expected = pd.read_csv(path)
+
+    pd.testing.assert_frame_equal(decoded(1), expected)
+    pd.testing.assert_frame_equal(data_access.load_dataset('sample'), expected)
+
+
+TYPED_CSV = (
+    "Code,Label,Year,Value,Note\n"
+    "B,Beta,2001,1.5,x\n"
+    "A,Alpha,2000,,\n"
+    "B,,2002,3.25,y\n"
+    "C,Gamma,2003,4,\n"
+)
+
+TYPED_DTYPES = {'Code': 'category', 'Label': 'category', 'Year': 'int64', 'Value': 'float64'}
+
+
+def test_store_round_trip(sample):
+    sample(TYPED_CSV, dtype=TYPED_DTYPES)
+    expected = data_access.read_csv('sample')
+
+    loaded = data_access.load_dataset('sample')
+
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert loaded['Label'].cat.categories.tolist() == ['Alpha', 'Beta', 'Gamma']
+    assert loaded['Year'].dtype == np.int64 and loaded['Value'].isna().sum() == 1
+    assert loaded['Note'].dtype == expected['Note'].dtype
+
+
+def test_store_round_trip_keeps_row_labels(sample):
+    sample(TYPED_CSV, dtype=TYPED_DTYPES, prepare=lambda df: df[df['Code'] != 'A'])
+
+    loaded = data_access.load_dataset('sample')
+
+    pd.testing.assert_frame_equal(loaded, data_access.read_csv('sample'), check_index_type=False)
+    assert loaded.index.tolist() == [0, 2, 3]
+
+
+def test_store_reads_requested_columns(sample):
+    sample(TYPED_CSV, dtype=TYPED_DTYPES)
+
+    loaded = data_access.load_dataset('sample', ['Value', 'Code'])
+
+    pd.testing.assert_frame_equal(loaded, data_access.read_csv('sample')[['Value', 'Code']])
+
+
+def test_changed_csv_rebuilds_store(sample):
+    path = sample(TYPED_CSV, dtype=TYPED_DTYPES)
+    assert data_access.is_stale('sample')
+    assert data_access.load_dataset('sample')['Year'].max() == 2003
+    assert not data_access.is_stale('sample')
+
+    with open(path, 'a') as f:
+        f.write("D,Delta,2010,5,z\n")
+    later = os.path.getmtime(path) + 10
+    os.utime(path, (later, later))
+    assert data_access.is_stale('sample')
+
+    loaded = data_access.load_dataset('sample')
+    assert loaded['Year'].max() == 2010
+    pd.testing.assert_frame_equal(loaded, data_access.read_csv('sample'))
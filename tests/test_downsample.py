@@ -0,0 +1,42 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+import downsample
+
+
+def line(x):
+    return go.Figure(go.Scatter(x=x, y=np.sin(np.arange(len(x)) / 50)))
+
+
+def test_lttb_keeps_ends_and_budget():
+    x = np.arange(1000)
+    keep = downsample.lttb(x, np.sin(x / 10), 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert (np.diff(keep) > 0).all()
+
+
+def test_lttb_rejects_unsorted_x():
+    with pytest.raises(ValueError):
+        downsample.lttb(np.arange(100)[::-1], np.arange(100), 10)
+
+
+def test_unsorted_trace_is_left_whole():
+    fig = downsample.downsample_figure(line(np.random.default_rng(0).permutation(2000)))
+
+    assert len(fig.data[0].x) == 2000
+
+
+def test_sorted_trace_is_capped():
+    fig = downsample.downsample_figure(line(np.arange(2000)), share=0.5)
+
+    assert len(fig.data[0].x) == downsample.CHART_WIDTH * 0.5 // downsample.PIXELS_PER_POINT
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setattr(downsample, 'enabled', False)
+    fig = downsample.downsample_figure(line(np.arange(2000)))
+
+    assert len(fig.data[0].x) == 2000
@@ -0,0 +1,18 @@
+import pandas as pd
+
+import export_charts
+
+
+def test_country_labels_are_unique():
+    df = pd.DataFrame({'Country': ["Korea, Rep.", "Korea (Rep.)", "All", "Japan"]})
+
+    selections = export_charts.country_selections('erosion', df)
+    labels = [label for label, _ in selections]
+
+    assert len(labels) == len(set(labels))
+    assert dict(selections[2:]) == {
+        'all-2': ['All'],
+        'japan': ['Japan'],
+        'korea-rep': ["Korea (Rep.)"],
+        'korea-rep-2': ["Korea, Rep."],
+    }
@@ -0,0 +1,111 @@
+"""fastpx must build the same figure JSON as Plotly Express for every
+combination of arguments the pages pass"""
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pytest
+
+from figures import fastpx
+
+
+def long_frame(n_colors, n_facets, years, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [
+        (f"Group {c}", f"Facet {f}", year)
+        for f in range(n_facets) for c in range(n_colors) for year in years
+    ]
+    df = pd.DataFrame(rows, columns=['color', 'facet', 'year'])
+    df['value'] = rng.random(len(df)) * 1000
+    df['extra'] = rng.integers(0, 100, len(df))
+    return df
+
+
+def as_json(fig):
+    return json.loads(pio.to_json(fig, validate=False))
+
+
+def assert_same(name, df, **kwargs):
+    expected = getattr(px, name)(df, **kwargs)
+    actual = getattr(fastpx, name)(df, **kwargs)
+    assert as_json(actual) == as_json(expected)
+
+
+# The land trends chart wraps one facet per country three to a row
+@pytest.mark.parametrize('n_facets', [1, 2, 3, 4, 8])
+def test_line_wrapped_facets(n_facets):
+    assert_same(
+        'line', long_frame(4, n_facets, range(2000, 2010)),
+        x='year', y='value', color='color', facet_col='facet', facet_col_wrap=3,
+        title='Trends', labels={'value': 'Area', 'year': 'Year'},
+    )
+
+
+# The erosion time series has one facet per erosion type, in one row
+@pytest.mark.parametrize('n_colors', [1, 5, 20])
+def test_line_facets_in_a_row(n_colors):
+    assert_same(
+        'line', long_frame(n_colors, 2, range(1990, 2020)),
+        x='year', y='value', color='color', facet_col='facet',
+        title='Erosion', labels={'value': 'Percentage', 'year': 'Year'},
+    )
+
+
+# The nutrient trend line has no facets and its own palette; more than
+# WEBGL_MIN_ROWS rows switch px to WebGL traces
+@pytest.mark.parametrize('n_colors', [3, 40])
+def test_line_without_facets(n_colors):
+    assert_same(
+        'line', long_frame(n_colors, 1, range(1985, 2023)),
+        x='year', y='value', color='color',
+        color_discrete_sequence=px.colors.qualitative.Pastel,
+        title='Trend', labels={'value': 'Tonnes', 'year': 'Year', 'area': 'Areas'},
+    )
+
+
+def test_line_too_many_wrapped_rows_raises_like_px():
+    df = long_frame(1, 60, range(2000, 2002))
+    kwargs = dict(x='year', y='value', color='color', facet_col='facet', facet_col_wrap=3)
+
+    with pytest.raises(ValueError) as expected:
+        px.line(df, **kwargs)
+    with pytest.raises(ValueError) as actual:
+        fastpx.line(df, **kwargs)
+    assert str(actual.value) == str(expected.value)
+
+
+@pytest.mark.parametrize('n_colors', [1, 6])
+def test_grouped_bar(n_colors):
+    df = long_frame(n_colors, 1, [2000]).rename(columns={'facet': 'country'})
+    assert_same(
+        'bar', df, x='color', y='value', color='country',
+        title='Average', labels={'value': 'Average Area'}, barmode='group',
+    )
+
+
+def test_stacked_bar():
+    assert_same(
+        'bar', long_frame(5, 1, range(2000, 2004)),
+        x='year', y='value', color='color', barmode='stack',
+        labels={'value': 'Tonnes'}, color_discrete_sequence=px.colors.qualitative.Pastel,
+    )
+
+
+def test_horizontal_bar_with_hover_data_and_color_map():
+    assert_same(
+        'bar', long_frame(2, 1, range(2000, 2006)),
+        x='value', y='year', color='color', orientation='h', hover_data=['extra'],
+        title='Composition', color_discrete_map={'Group 0': 'green', 'Group 1': 'gray'},
+    )
+
+
+@pytest.mark.parametrize('name,kwargs', [
+    ('line', dict(facet_col='facet')),
+    ('line', dict(facet_col='facet', facet_col_wrap=3)),
+    ('bar', dict(barmode='stack')),
+])
+def test_empty_frame(name, kwargs):
+    df = long_frame(2, 2, [2000]).iloc[:0]
+    assert_same(name, df, x='year', y='value', color='color', **kwargs)
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import figure_cache
+from figure_cache import FigureCache, cached_figure, figure_size
+
+MB = 1024 * 1024
+
+
+def figure(n_points=10):
+    return go.Figure(go.Scatter(x=np.arange(n_points, dtype='float64'), y=np.ones(n_points)))
+
+
+def test_evicts_least_recently_used_by_count():
+    cache = FigureCache(max_entries=3)
+    figs = {key: figure() for key in 'abcd'}
+    for key in 'abc':
+        cache.put(key, figs[key])
+
+    assert cache.get('a') is figs['a']
+    cache.put('d', figs['d'])
+
+    assert cache.get('b') is None
+    assert [key for key in 'acd' if cache.get(key) is figs[key]] == ['a', 'c', 'd']
+    assert cache.size == sum(figure_size(figs[key]) for key in 'acd')
+
+
+def test_evicts_by_estimated_size():
+    # x and y of 1.25M float64 points each: 20 MB of data per figure
+    big = [figure(1_250_000) for _ in range(5)]
+    size = figure_size(big[0])
+    assert 20 * MB <= size < 30 * MB
+    fits = figure_cache.MAX_BYTES // size
+
+    cache = FigureCache()
+    for i, fig in enumerate(big):
+        cache.put(i, fig)
+
+    assert cache.size <= figure_cache.MAX_BYTES
+    kept = [i for i in range(len(big)) if cache.get(i) is big[i]]
+    assert kept == list(range(len(big)))[-fits:]
+
+
+def test_skips_figure_larger_than_the_budget():
+    cache = FigureCache(max_bytes=MB)
+    cache.put('small', figure())
+    cache.put('huge', figure(100_000))
+
+    assert cache.get('huge') is None
+    assert cache.get('small') is not None
+
+
+def test_replacing_an_entry_keeps_size_exact():
+    cache = FigureCache()
+    cache.put('a', figure(1000))
+    cache.put('a', figure(10))
+
+    assert cache.size == figure_size(figure(10))
+
+
+@cached_figure
+def chart(df, title=None):
+    return go.Figure(go.Bar(x=df['x'], y=df['y']))
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'x': ['a', 'b', 'c'], 'y': [1.0, 2.0, 3.0]})
+
+
+def key(*args, **kwargs):
+    return chart.cache_key(args, kwargs)
+
+
+def test_key_is_stable_for_equal_inputs(df):
+    assert key(df, title='t') == key(df.copy(), title='t')
+
+
+@pytest.mark.parametrize('change', [
+    lambda df: df.assign(y=[1.0, 2.0, 4.0]),
+    lambda df: df.assign(x=['a', 'b', 'd']),
+    lambda df: df.set_axis([5, 6, 7]),
+    lambda df: df.rename(columns={'y': 'z'}),
+    lambda df: df.iloc[::-1],
+    lambda df: df.astype({'y': 'float32'}),
+])
+def test_key_differs_for_frames_of_equal_shape(df, change):
+    changed = change(df)
+    assert changed.shape == df.shape
+
+    assert key(changed) != key(df)
+
+
+def test_key_covers_other_arguments(df):
+    assert key(df, title='a') != key(df, title='b')
+    assert key(df, (2000, 2010)) != key(df, (2000, 2011))
+    assert key(np.arange(3)) != key(np.arange(3, dtype='float64'))
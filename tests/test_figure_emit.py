@@ -0,0 +1,77 @@
+"""compact_figure must send every trace, animation frames included, as typed
+arrays that decode back to the values the figure was built from"""
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from figure_emit import compact_array, compact_figure
+from figures.greenhouse import emissions_choropleth_animation
+
+VALUES = {
+    'whole floats': [float(i) for i in range(-5, 15)],
+    'ints': list(range(-1000, 70000, 3500)),
+    'float32 exact': [i / 4 for i in range(20)],
+    'float64': [i / 3 for i in range(20)],
+    'with NaN': [np.nan, 1.5, np.nan] + [i / 8 for i in range(10)],
+}
+
+
+def decode(value):
+    """A typed array spec of the figure JSON as a numpy array"""
+    assert isinstance(value, dict) and set(value) == {'dtype', 'bdata'}
+    return np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+
+
+def sent(fig):
+    return json.loads(pio.to_json(fig, validate=False))
+
+
+@pytest.mark.parametrize('values', VALUES.values(), ids=VALUES.keys())
+def test_typed_arrays_decode_to_the_original_values(values):
+    fig = go.Figure(
+        go.Scatter(x=list(range(len(values))), y=values),
+        frames=[go.Frame(data=[go.Scatter(y=values[::-1])], name='reversed')],
+    )
+    payload = sent(compact_figure(fig))
+
+    np.testing.assert_array_equal(decode(payload['data'][0]['y']), values)
+    np.testing.assert_array_equal(
+        decode(payload['frames'][0]['data'][0]['y']), values[::-1]
+    )
+
+
+def test_compacts_animation_frames():
+    years = list(range(2000, 2010))
+    values = np.arange(30, dtype='float64').reshape(10, 3) * 1.25
+    values[2, 1] = np.nan
+    fig = emissions_choropleth_animation(
+        ['Austria', 'Belgium', 'Chile'], values, years, 'CO2', 2003, 'Viridis'
+    )
+    payload = sent(compact_figure(fig))
+
+    assert [frame['name'] for frame in payload['frames']] == list(map(str, years))
+    for frame, row in zip(payload['frames'], values):
+        np.testing.assert_array_equal(decode(frame['data'][0]['z']), row)
+    np.testing.assert_array_equal(decode(payload['data'][0]['z']), values[3])
+
+
+def test_ints_beyond_int32_stay_exact():
+    # The browser has no int64 typed array, so Plotly keeps these as a list
+    values = [2**40 + i for i in range(10)]
+    payload = sent(compact_figure(go.Figure(go.Scatter(y=values))))
+    assert payload['data'][0]['y'] == values
+
+
+def test_leaves_short_and_non_numeric_arrays_alone():
+    assert compact_array([1.0, 2.0]) is None
+    assert compact_array(['a'] * 10) is None
+    assert compact_array('abcdefghij') is None
+
+    fig = go.Figure(go.Scatter(x=['a', 'b', 'c'], y=[1.5, 2.5, 3.5]))
+    payload = sent(compact_figure(fig))
+    assert payload['data'][0]['x'] == ['a', 'b', 'c']
+    assert payload['data'][0]['y'] == [1.5, 2.5, 3.5]
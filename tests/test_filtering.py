@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from filtering import FilterPlan, InvertedIndex, filter_rows
+
+
+@pytest.fixture(scope='module')
+def df():
+    rng = np.random.default_rng(0)
+    n = 200
+    return pd.DataFrame({
+        'Country': pd.Categorical(rng.choice(['France', 'Japan', 'Chile', 'Peru'], n)),
+        'Type': rng.choice(['Wind', 'Water'], n),
+        'Time': rng.integers(1990, 2020, n),
+        'OBS_VALUE': rng.random(n),
+    }, index=rng.permutation(1000)[:n])
+
+
+@pytest.fixture(scope='module')
+def index(df):
+    return InvertedIndex(df, ['Country', 'Type'])
+
+
+def reference(df, isin=None, ranges=None):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (isin or {}).items():
+        if len(values):
+            mask &= df[column].isin(values).to_numpy()
+    for column, bounds in (ranges or {}).items():
+        if len(bounds):
+            low, high = bounds
+            mask &= ((df[column] >= low) & (df[column] <= high)).to_numpy()
+    return df[mask]
+
+
+def test_index_rows(df, index):
+    rows = index.rows('Country', ['Japan', 'France', 'Japan'])
+
+    assert (np.diff(rows) > 0).all()
+    assert df.iloc[rows].equals(df[df['Country'].isin(['France', 'Japan'])])
+
+
+def test_index_rows_of_absent_values(index):
+    assert len(index.rows('Country', ['Atlantis'])) == 0
+    assert len(index.rows('Country', [])) == 0
+
+
+def test_index_select(df, index):
+    rows = index.select({'Country': ['Chile', 'Atlantis'], 'Type': ['Wind']})
+
+    assert df.iloc[rows].equals(reference(df, {'Country': ['Chile'], 'Type': ['Wind']}))
+    assert index.select({}) is None
+
+
+CASES = [
+    dict(isin={'Country': ['France', 'Peru']}),
+    dict(isin={'Country': ['France'], 'Type': ['Water']}, ranges={'Time': (2000, 2009)}),
+    dict(isin={'Country': ['Atlantis']}),
+    dict(isin={'Country': ['Atlantis', 'Japan']}),
+    dict(ranges={'Time': (2005, 2005)}),
+    dict(ranges={'Time': (1990, 2019), 'OBS_VALUE': (0.25, 0.75)}),
+    # An empty selection leaves its column unfiltered
+    dict(isin={'Country': [], 'Type': ['Wind']}, ranges={'Time': ()}),
+]
+
+
+@pytest.mark.parametrize('case', CASES)
+@pytest.mark.parametrize('indexed', [False, True])
+def test_filter_rows(df, index, case, indexed):
+    result = filter_rows(df, index=index if indexed else None, **case)
+
+    pd.testing.assert_frame_equal(result, reference(df, **case))
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_filter_rows_returns_frame_itself_when_nothing_is_dropped(df, index, indexed):
+    index = index if indexed else None
+
+    assert filter_rows(df, index=index) is df
+    assert filter_rows(df, isin={'Country': []}, index=index) is df
+    assert filter_rows(df, ranges={'Time': (1990, 2019)}, index=index) is df
+    assert filter_rows(df, isin={'Country': ['France', 'Japan', 'Chile', 'Peru']}, index=index) is df
+    assert filter_rows(df, ranges={'Time': (2000, 2019)}, index=index) is not df
+
+
+def test_plan(df, index):
+    selected = index.rows('Type', ['Wind'])
+    plan = (
+        FilterPlan('Country')
+        .add('europe', 'France')
+        .add('americas', ['Chile', 'Peru'])
+        .add('everywhere', ['France', 'Japan'], filtered=False)
+        .add('nowhere', ['Atlantis'])
+    )
+
+    subsets = plan.execute(df, index, ranges={'Time': (2000, 2010)}, selected=selected)
+
+    in_range = reference(df, ranges={'Time': (2000, 2010)})
+    wind = in_range[in_range['Type'] == 'Wind']
+    pd.testing.assert_frame_equal(subsets['europe'], wind[wind['Country'] == 'France'])
+    pd.testing.assert_frame_equal(subsets['americas'], wind[wind['Country'].isin(['Chile', 'Peru'])])
+    # Not restricted to the selected rows
+    pd.testing.assert_frame_equal(subsets['everywhere'], in_range[in_range['Country'].isin(['France', 'Japan'])])
+    assert subsets['nowhere'].empty
+
+
+def test_plan_without_ranges_or_selection(df, index):
+    subsets = FilterPlan('Type').add('wind', 'Wind').execute(df, index)
+
+    pd.testing.assert_frame_equal(subsets['wind'], df[df['Type'] == 'Wind'])
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from year_index import YearRangeIndex
+
+# 2003 is a gap year: no key combination has a row for it
+YEARS = [2000, 2001, 2002, 2004, 2005, 2006]
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    rows = [
+        (area, measure, year)
+        for area in ['A', 'B', 'C'] for measure in ['In', 'Out'] for year in YEARS
+        # B has no Out rows before 2005
+        if not (area == 'B' and measure == 'Out' and year < 2005)
+    ]
+    df = pd.DataFrame(rows, columns=['area', 'measure', 'TIME_PERIOD'])
+    df['OBS_VALUE'] = rng.integers(1, 1000, len(df)).astype('float64')
+    # Duplicate rows are summed
+    return pd.concat([df, df.iloc[:5]], ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def index(data):
+    return YearRangeIndex(data, ['area', 'measure'])
+
+
+def expected_rows(data, start, end, filters):
+    rows = data[(data['TIME_PERIOD'] >= start) & (data['TIME_PERIOD'] <= end)]
+    for key, values in filters.items():
+        if values is not None:
+            rows = rows[rows[key].isin([values] if isinstance(values, str) else values)]
+    return rows
+
+
+RANGES = [
+    (2000, 2006),  # everything
+    (2002, 2002),  # start equal to end
+    (2003, 2003),  # only the gap year
+    (2002, 2004),  # across the gap
+    (1990, 2001),  # start before the first year
+    (2005, 2030),  # end past the last year
+    (1980, 1990),  # entirely before
+    (2010, 2020),  # entirely after
+    (2005, 2001),  # start after end
+]
+
+FILTERS = [
+    {},
+    {'area': None, 'measure': None},
+    {'area': 'B'},
+    {'area': ['A', 'C'], 'measure': 'Out'},
+    {'area': ['nowhere']},
+]
+
+
+@pytest.mark.parametrize('start,end', RANGES)
+@pytest.mark.parametrize('filters', FILTERS)
+def test_range_sum(data, index, start, end, filters):
+    expected = expected_rows(data, start, end, filters)['OBS_VALUE'].sum()
+
+    assert index.range_sum(start, end, filters) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('start,end', RANGES)
+@pytest.mark.parametrize('by', ['area', 'measure'])
+def test_range_sum_by(data, index, start, end, by):
+    filters = {'area': ['A', 'B']}
+    rows = expected_rows(data, start, end, filters)
+    expected = rows.groupby(by)['OBS_VALUE'].sum()
+
+    result = index.range_sum(start, end, filters, by=by)
+
+    # Every matching key is reported, with 0 when it has no rows in range
+    assert set(expected.index) <= set(result.index)
+    pd.testing.assert_series_equal(
+        result.reindex(expected.index), expected, check_names=False, check_index_type=False
+    )
+    assert (result.drop(expected.index) == 0).all()